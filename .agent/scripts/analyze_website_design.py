@@ -2,31 +2,986 @@
 """
 網站設計分析腳本
 分析 ewill.com.tw 的設計架構與風格規範
+
+使用方式：
+  python3 .agent/scripts/analyze_website_design.py [analyze] [--async] [--concurrency N]
+                                                   [--max-pages N] [--dist [DIR]]
+                                                   [--output-dir DIR]
+                                                   [--parser {html.parser,lxml,stream}]
+  python3 .agent/scripts/analyze_website_design.py css FILE... [-o OUTPUT]
+  python3 .agent/scripts/analyze_website_design.py report JSON [-o OUTPUT]
+  python3 .agent/scripts/analyze_website_design.py diff OLD NEW [-o OUTPUT] [--min-shift PCT]
+                                                   [--check]
+
+子命令：
+  analyze（預設）抓取並分析網站；css 只分析本機 CSS 檔；report 由 analyze
+  產生的 JSON 重新產生 Markdown；diff 比較兩份報告（analyze 或 css 產生）的
+  色彩、字型、間距與斷點，列出新增、移除與頻率變化的 token。
+  requests、bs4、asyncio 只在 analyze 實際使用時載入，css / report / diff
+  不需這些套件。各子命令加上 --import-time 時只量測啟動時間（模組本身與
+  各套件的載入時間）後結束，可用來追蹤冷啟動延遲。
+
+  --async 時以 asyncio 平行抓取所有 CSS（共用連線池，最多 N 個同時連線），
+  報告內容與序列模式相同。
+  --max-pages 時從首頁以廣度優先爬取同源頁面（網址去重、每個主機限制
+  同時連線數），彙整所有頁面的設計元素；共用的樣式表只抓取、解析一次。
+
+快取：
+  回應保存於 .cache/design-analyzer/（每個 URL 一個 JSON），下次執行以
+  ETag / Last-Modified 條件請求重新驗證，未變更（304）時直接使用快取。
+  --offline 只讀快取、完全不連線，可搭配 --cache-dir 指定測試用的快取目錄；
+  --no-cache 停用快取。
+
+本機建置輸出：
+  --dist [DIR] 直接讀取 astro-app 建置後的 HTML 與 CSS（不連線、不使用快取），
+  分析目錄中的所有頁面（--max-pages 可限制頁數），報告格式與線上分析相同。
+  網址依 Astro 的目錄格式對應檔案（/about/ → about/index.html），大型檔案以
+  mmap 讀取。報告輸出至 --output-dir（預設 .cache/design-report/）。
+
+解析：
+  --parser 選擇 HTML 解析方式，報告內容相同：
+  - html.parser（預設）：BeautifulSoup + 標準函式庫
+  - lxml：BeautifulSoup + lxml，建樹較快（需安裝 lxml；標籤不成對的頁面
+    lxml 會自動補正，結果可能與 html.parser 不同）
+  - stream：不建立 DOM 樹，以 html.parser 事件直接驅動分析，記憶體用量最低
+  效能比較見 bench_html_parser.py。
 """
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import time
+
+# 啟動時間的起點（--import-time）
+MODULE_START = time.perf_counter()
+
+# 只在模組層級載入輕量的標準函式庫；requests、bs4、asyncio 於實際使用時才載入，
+# css / report 子命令不需要網路與 HTML 解析
+import hashlib
+import importlib
+import importlib.util
+import mimetypes
+import mmap
+import os
+from html.parser import HTMLParser
+from urllib.parse import quote, unquote, urldefrag, urljoin, urlparse
 import re
+import sys
 import json
-from collections import defaultdict, Counter
-import cssutils
-import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque, Counter
+from functools import lru_cache, partial
+from pathlib import Path
 
-# Suppress cssutils warnings
-cssutils.log.setLevel(logging.CRITICAL)
+# lxml 為選用套件：只檢查是否安裝，不在啟動時載入
+HAS_LXML = importlib.util.find_spec('lxml') is not None
 
 BASE_URL = "https://www.ewill.com.tw/"
+REQUEST_TIMEOUT = 30
+DEFAULT_CONCURRENCY = 8
+
+HTTP_CACHE_DIR = Path('.cache') / 'design-analyzer'
+
+# 報告輸出目錄（design-analysis.json、DESIGN_GUIDELINE.md）；
+# 不預設為專案根目錄，避免覆蓋手動維護的 DESIGN_GUIDELINE.md
+REPORT_DIR = Path('.cache') / 'design-report'
+REPORT_JSON_NAME = 'design-analysis.json'
+REPORT_MARKDOWN_NAME = 'DESIGN_GUIDELINE.md'
+
+# astro-app 建置輸出的候選位置（--dist 未指定目錄時依序尋找）
+DIST_CANDIDATES = [
+    Path('astro-app') / '.vercel' / 'output' / 'static',
+    Path('astro-app') / 'dist' / 'client',
+    Path('astro-app') / 'dist',
+]
+# 大於此大小的檔案以 mmap 讀取
+MMAP_THRESHOLD = 1024 * 1024
+
+# 頁面解析方式：BeautifulSoup 的 html.parser / lxml 樹，或不建樹的事件串流
+PARSER_BACKENDS = ('html.parser', 'lxml', 'stream')
+DEFAULT_PARSER = 'html.parser'
+
+# 爬取時略過的連結類型
+NON_HTML_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico',
+    '.zip', '.rar', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.mp4', '.mp3', '.css', '.js', '.xml', '.json',
+)
+
+CSS_DELIMITER_PATTERN = re.compile(r'([{};])')
+CSS_STRING_PATTERN = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+AT_RULE_PATTERN = re.compile(r'@([\w-]*)\s*(.*)', re.DOTALL)
+CSS_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_ESCAPE_PATTERN = re.compile(r'\\.', re.DOTALL)
+# 未閉合的片段最多接回幾次（超過則視為誤判，只用原本的片段）
+MAX_CSS_REJOINS = 32
+
+COLOR_PATTERN = re.compile(
+    r'#[0-9a-fA-F]{6}\b|#[0-9a-fA-F]{3}\b'
+    r'|rgb\s*\(\s*\d+\s*,\s*\d+\s*,\s*\d+\s*\)'
+    r'|rgba\s*\(\s*\d+\s*,\s*\d+\s*,\s*\d+\s*,\s*[\d.]+\s*\)',
+    re.IGNORECASE
+)
+CLASS_SELECTOR_PATTERN = re.compile(r'\.([a-zA-Z_-][a-zA-Z0-9_-]*)')
+SPACING_PROPERTY_PATTERN = re.compile(r'(?:margin|padding)(?:-(?:top|right|bottom|left))?$|gap$')
+PX_PATTERN = re.compile(r'(\d+)px')
+
+def _is_unbalanced(chunk):
+    """
+    片段中有未閉合的括號或字串（其中的 ; { } 不是分隔符號）
+    
+    跳脫字元（例如 Tailwind 的 .content-\\[\\'\\(\\'\\]）不算括號或引號；
+    字串內的括號也不計。
+    """
+    if '\\' in chunk:
+        chunk = CSS_ESCAPE_PATTERN.sub('', chunk)
+    if '"' in chunk or "'" in chunk:
+        chunk = CSS_STRING_PATTERN.sub('', chunk)
+        if '"' in chunk or "'" in chunk:
+            return True
+    return chunk.count('(') > chunk.count(')')
+
+def tokenize_css(css):
+    """
+    單次走訪樣式表，依序產出：
+    
+        ('at-rule', 名稱, prelude)       例如 ('at-rule', 'media', '(max-width: 768px)')
+        ('selector', 選擇器)
+        ('declaration', 屬性, 值)
+    
+    以 { ; } 切分（C 層級的單次 split），只有含括號或引號、
+    且被切在中間的片段（例如 url(data:...;base64,...)）才接回。
+    接回不跨越 }、最多 MAX_CSS_REJOINS 次；仍未閉合時只用原本的片段，
+    單一寫壞的規則不會吞掉其後的整份樣式表。
+    不建立語法樹，巢狀區塊（@media、CSS nesting）以相同方式處理。
+    """
+    if '/*' in css:
+        css = CSS_COMMENT_PATTERN.sub('', css)
+    
+    # [片段, 分隔符號, 片段, 分隔符號, ..., 片段, '']
+    parts = CSS_DELIMITER_PATTERN.split(css)
+    parts.append('')
+    i = 0
+    while i < len(parts):
+        chunk, delimiter = parts[i], parts[i + 1]
+        i += 2
+        if ('(' in chunk or '"' in chunk or "'" in chunk) and _is_unbalanced(chunk):
+            # 接回後續片段，直到括號與字串閉合
+            joined, joined_delimiter, j = chunk, delimiter, i
+            for _ in range(MAX_CSS_REJOINS):
+                if j >= len(parts) or joined_delimiter == '}':
+                    break
+                joined += joined_delimiter + parts[j]
+                joined_delimiter = parts[j + 1]
+                j += 2
+                if not _is_unbalanced(joined):
+                    chunk, delimiter, i = joined, joined_delimiter, j
+                    break
+        
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        
+        if chunk[0] == '@':
+            name, prelude = AT_RULE_PATTERN.match(chunk).groups()
+            yield ('at-rule', name.lower(), prelude)
+        elif delimiter == '{':
+            yield ('selector', chunk)
+        elif ':' in chunk:
+            prop, _, value = chunk.partition(':')
+            yield ('declaration', prop.strip().lower(), value.strip())
+
+# DOM 分析用的 class 比對規則
+NAV_CLASS_PATTERN = re.compile(r'header|nav', re.I)
+FOOTER_CLASS_PATTERN = re.compile(r'footer', re.I)
+BREADCRUMB_CLASS_PATTERN = re.compile(r'breadcrumb', re.I)
+ICON_CLASS_PATTERN = re.compile(r'icon|fa-|bi-', re.I)
+SECTION_CLASS_PATTERN = re.compile(r'section|container|wrapper|row|col', re.I)
+GRID_CLASS_PATTERN = re.compile(r'grid|row|col|flex', re.I)
+SKIP_CLASS_PATTERN = re.compile(r'skip', re.I)
+
+TYPOGRAPHY_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'span', 'a']
+SEMANTIC_TAGS = ['header', 'nav', 'main', 'article', 'section', 'aside', 'footer']
+FORM_FIELD_TAGS = {'input', 'textarea', 'select'}
+
+def class_matches(pattern, classes):
+    """與 BeautifulSoup 的 class_=re.compile(...) 相同：任一 class 或整串 class 符合"""
+    if not classes:
+        return False
+    return _class_tuple_matches(pattern, tuple(classes))
+
+@lru_cache(maxsize=4096)
+def _class_tuple_matches(pattern, classes):
+    # 同一組 class 在頁面中大量重複，每個 pattern 只比對一次
+    return any(pattern.search(cls) for cls in classes) or pattern.search(' '.join(classes)) is not None
+
+class DomCollector(ABC):
+    """
+    DOM 走訪的事件接收者
+    
+    visit_soup / StreamingDomParser 依文件順序呼叫 handle_start(tag, attrs, depth)、
+    handle_text(data)、handle_rawtext(data)、handle_end(tag, depth)；
+    子類別通常只需實作 start() 與 result()；result() 為抽象方法，
+    未實作的子類別在建立時就會失敗，而非爬到一半才出錯。
+    需要元素文字（等同 get_text(strip=True)）時，在 start 中呼叫
+    capture_text(depth, callback)，元素結束時以文字呼叫 callback。
+    結果中清單欄位的長度上限寫在 LIMITS，多個頁面合併後以 limit() 重新套用。
+    """
+    
+    # 結果欄位 → 清單長度上限
+    LIMITS = {}
+    
+    def __init__(self):
+        # [depth, 文字片段, callback]
+        self._captures = []
+    
+    def capture_text(self, depth, callback):
+        self._captures.append([depth, [], callback])
+    
+    def handle_start(self, tag, attrs, depth):
+        self.start(tag, attrs, depth)
+    
+    def handle_text(self, data):
+        if self._captures:
+            data = data.strip()
+            if data:
+                for capture in self._captures:
+                    capture[1].append(data)
+    
+    def handle_rawtext(self, data):
+        """<script>/<style> 的原始內容（不計入元素文字）"""
+        pass
+    
+    def handle_end(self, tag, depth):
+        while self._captures and self._captures[-1][0] == depth:
+            _, parts, callback = self._captures.pop()
+            callback(''.join(parts))
+    
+    def start(self, tag, attrs, depth):
+        pass
+    
+    @abstractmethod
+    def result(self):
+        """回傳此 collector 的分析結果（dict）"""
+    
+    @classmethod
+    def limit(cls, result):
+        """對（合併後的）結果重新套用 LIMITS"""
+        return {key: value[:cls.LIMITS[key]] if key in cls.LIMITS else value
+                for key, value in result.items()}
+
+class NavigationCollector(DomCollector):
+    """導覽結構（對應 analyze_navigation）"""
+    
+    LINK_LIMIT = 20
+    LIMITS = {'main_nav': LINK_LIMIT, 'footer_nav': LINK_LIMIT}
+    
+    def __init__(self):
+        super().__init__()
+        # 候選容器：名稱 → {'depth', 'links'}；各取文件中第一個符合的元素
+        self.containers = {}
+        self.breadcrumb = None
+    
+    def _open(self, name, depth):
+        if name not in self.containers:
+            self.containers[name] = {'depth': depth, 'links': [], 'open': True}
+    
+    def start(self, tag, attrs, depth):
+        classes = attrs.get('class', [])
+        if tag == 'header':
+            self._open('header', depth)
+        if tag == 'nav':
+            self._open('nav', depth)
+        if tag == 'footer':
+            self._open('footer', depth)
+        if class_matches(NAV_CLASS_PATTERN, classes):
+            self._open('nav_class', depth)
+        if class_matches(FOOTER_CLASS_PATTERN, classes):
+            self._open('footer_class', depth)
+        if self.breadcrumb is None and class_matches(BREADCRUMB_CLASS_PATTERN, classes):
+            self.breadcrumb = ''
+            self.capture_text(depth, self._set_breadcrumb)
+        
+        if tag == 'a':
+            for container in self.containers.values():
+                # 只計入容器內的連結（不含容器本身）
+                if container['open'] and container['depth'] < depth and len(container['links']) < self.LINK_LIMIT:
+                    link = {'text': '', 'href': attrs.get('href', '')}
+                    container['links'].append(link)
+                    self.capture_text(depth, partial(self._set_link_text, link))
+    
+    def handle_end(self, tag, depth):
+        super().handle_end(tag, depth)
+        for container in self.containers.values():
+            if container['open'] and container['depth'] == depth:
+                container['open'] = False
+    
+    def _set_link_text(self, link, text):
+        link['text'] = text[:50]
+    
+    def _set_breadcrumb(self, text):
+        self.breadcrumb = text[:200]
+    
+    def _links(self, *names):
+        for name in names:
+            if name in self.containers:
+                return self.containers[name]['links']
+        return []
+    
+    def result(self):
+        return {
+            'main_nav': self._links('header', 'nav', 'nav_class'),
+            'sub_nav': [],
+            'footer_nav': self._links('footer', 'footer_class'),
+            'breadcrumb': self.breadcrumb
+        }
+
+class UiComponentsCollector(DomCollector):
+    """UI 元件（對應 analyze_ui_components）"""
+    
+    LIMITS = {'buttons': 20, 'forms': 5, 'images': 20, 'icons': 30}
+    
+    def __init__(self):
+        super().__init__()
+        self.btn_classes = set()
+        # [depth, form_info]
+        self.forms = []
+        self.images = []
+        self.icon_classes = set()
+    
+    def start(self, tag, attrs, depth):
+        classes = attrs.get('class', [])
+        
+        # 按鈕
+        if tag in ('button', 'a'):
+            for cls in classes:
+                if 'btn' in cls.lower() or 'button' in cls.lower():
+                    self.btn_classes.add(cls)
+        
+        # 表單（前 5 個）與其中的輸入欄位
+        if tag in FORM_FIELD_TAGS:
+            for form_depth, form_info in self.forms:
+                if form_depth is not None:
+                    form_info['inputs'] += 1
+        if tag == 'form' and len(self.forms) < self.LIMITS['forms']:
+            self.forms.append([depth, {
+                'action': attrs.get('action', ''),
+                'method': attrs.get('method', ''),
+                'inputs': 0
+            }])
+        
+        # 圖片
+        if tag == 'img' and len(self.images) < self.LIMITS['images']:
+            self.images.append({
+                'src': attrs.get('src', '')[:100],
+                'alt': attrs.get('alt', '')[:50],
+                'class': ' '.join(classes)
+            })
+        
+        # 圖示 (font icons, svg)
+        if class_matches(ICON_CLASS_PATTERN, classes):
+            self.icon_classes.update(classes)
+    
+    def handle_end(self, tag, depth):
+        super().handle_end(tag, depth)
+        for form in self.forms:
+            if form[0] == depth:
+                form[0] = None
+    
+    def result(self):
+        return {
+            'buttons': list(self.btn_classes)[:self.LIMITS['buttons']],
+            'forms': [form_info for _, form_info in self.forms],
+            'cards': [],
+            'images': self.images,
+            'icons': list(self.icon_classes)[:self.LIMITS['icons']]
+        }
+
+class LayoutCollector(DomCollector):
+    """版面結構（對應 analyze_layout）"""
+    
+    LIMITS = {'sections': 30, 'grid_classes': 30}
+    
+    def __init__(self):
+        super().__init__()
+        self.section_classes = set()
+        self.grid_classes = set()
+    
+    def start(self, tag, attrs, depth):
+        classes = attrs.get('class', [])
+        if not classes:
+            return
+        if tag in ('section', 'div') and class_matches(SECTION_CLASS_PATTERN, classes):
+            self.section_classes.update(classes)
+        if class_matches(GRID_CLASS_PATTERN, classes):
+            self.grid_classes.update(classes)
+    
+    def result(self):
+        return {
+            'sections': list(self.section_classes)[:self.LIMITS['sections']],
+            'grid_classes': list(self.grid_classes)[:self.LIMITS['grid_classes']],
+            'container_classes': []
+        }
+
+class TypographyCollector(DomCollector):
+    """文字層級（對應 analyze_typography_hierarchy）"""
+    
+    # 每個標籤的上限
+    LIMITS = {'sample_classes': 10, 'samples': 3}
+    
+    def __init__(self):
+        super().__init__()
+        self.tags = {tag: {'count': 0, 'classes': set(), 'samples': []} for tag in TYPOGRAPHY_TAGS}
+    
+    def start(self, tag, attrs, depth):
+        info = self.tags.get(tag)
+        if info is None:
+            return
+        info['count'] += 1
+        # 前 5 個元素取類別與文字範例
+        if info['count'] <= 5:
+            info['classes'].update(attrs.get('class', []))
+            # 先佔位：巢狀的同名標籤會先結束，範例仍須依開始順序排列
+            info['samples'].append('')
+            self.capture_text(depth, partial(self._set_sample, info['samples'], len(info['samples']) - 1))
+    
+    def _set_sample(self, samples, index, text):
+        samples[index] = text[:100]
+    
+    def result(self):
+        return {
+            tag: {
+                'count': info['count'],
+                'sample_classes': list(info['classes'])[:self.LIMITS['sample_classes']],
+                'samples': [text for text in info['samples'] if text][:self.LIMITS['samples']]
+            }
+            for tag, info in self.tags.items() if info['count']
+        }
+    
+    @classmethod
+    def limit(cls, result):
+        return {tag: super(TypographyCollector, cls).limit(info) for tag, info in result.items()}
+
+class AccessibilityCollector(DomCollector):
+    """無障礙設計（對應 analyze_accessibility）"""
+    
+    LIMITS = {'aria_labels': 10}
+    
+    def __init__(self):
+        super().__init__()
+        self.a11y = {
+            'images_with_alt': 0,
+            'images_without_alt': 0,
+            'aria_labels': [],
+            'form_labels': 0,
+            'skip_links': False,
+            'lang_attribute': None,
+            'semantic_elements': {}
+        }
+        self.semantic_counts = Counter()
+        self.seen_html = False
+    
+    def start(self, tag, attrs, depth):
+        a11y = self.a11y
+        if tag == 'img':
+            if attrs.get('alt'):
+                a11y['images_with_alt'] += 1
+            else:
+                a11y['images_without_alt'] += 1
+        if 'aria-label' in attrs and len(a11y['aria_labels']) < self.LIMITS['aria_labels']:
+            a11y['aria_labels'].append(attrs['aria-label'])
+        if tag == 'label':
+            a11y['form_labels'] += 1
+        if attrs.get('href') == '#main' or class_matches(SKIP_CLASS_PATTERN, attrs.get('class', [])):
+            a11y['skip_links'] = True
+        if tag == 'html' and not self.seen_html:
+            self.seen_html = True
+            a11y['lang_attribute'] = attrs.get('lang')
+        if tag in SEMANTIC_TAGS:
+            self.semantic_counts[tag] += 1
+    
+    def result(self):
+        self.a11y['semantic_elements'] = {
+            tag: self.semantic_counts[tag] for tag in SEMANTIC_TAGS if self.semantic_counts[tag]
+        }
+        return self.a11y
+
+class PageResourcesCollector(DomCollector):
+    """頁面引用的資源：外部樣式表、inline <style> 與連結（抓取、爬取時使用）"""
+    
+    def __init__(self):
+        super().__init__()
+        self.stylesheets = []
+        self.inline_styles = []
+        self.links = []
+        self._style = None
+    
+    def start(self, tag, attrs, depth):
+        if tag == 'link' and attrs.get('href') and 'stylesheet' in attrs.get('rel', []):
+            self.stylesheets.append(attrs['href'])
+        elif tag == 'a' and 'href' in attrs:
+            self.links.append(attrs['href'])
+        elif tag == 'style':
+            self._style = []
+    
+    def handle_rawtext(self, data):
+        if self._style is not None:
+            self._style.append(data)
+    
+    def handle_end(self, tag, depth):
+        super().handle_end(tag, depth)
+        if tag == 'style' and self._style is not None:
+            text = ''.join(self._style)
+            if text:
+                self.inline_styles.append(text)
+            self._style = None
+    
+    def result(self):
+        return {
+            'stylesheets': self.stylesheets,
+            'inline_styles': self.inline_styles,
+            'links': self.links
+        }
+
+# 報告欄位 → collector 類別
+DOM_COLLECTORS = {
+    'navigation': NavigationCollector,
+    'ui_components': UiComponentsCollector,
+    'layout': LayoutCollector,
+    'typography_hierarchy': TypographyCollector,
+    'accessibility': AccessibilityCollector,
+}
+
+# report 子命令需要的欄位：analyze 報告才有 url 與 DOM 區段（css 報告沒有）
+REPORT_KEYS = ('url', 'colors', 'fonts', 'spacing', 'breakpoints', 'css_classes', *DOM_COLLECTORS)
+
+def missing_report_keys(report) -> list:
+    """回傳 format_markdown_report 需要、但報告中缺少的欄位"""
+    if not isinstance(report, dict):
+        return list(REPORT_KEYS)
+    return [key for key in REPORT_KEYS if key not in report]
+
+def visit_soup(soup, collectors):
+    """
+    單次走訪 BeautifulSoup 樹，將每個元素與文字分派給所有 collector
+    
+    以明確的堆疊取代遞迴，深層巢狀的頁面也不會超過遞迴上限。
+    """
+    from bs4 import CData, NavigableString, Script, Stylesheet, Tag
+    
+    # get_text() 計入的字串類型（不含註解、<script>/<style> 內容）
+    text_string_types = (NavigableString, CData)
+    raw_text_string_types = (Script, Stylesheet)
+    
+    depth = 0
+    names = []
+    stack = [iter(soup.contents)]
+    while stack:
+        for node in stack[-1]:
+            if isinstance(node, Tag):
+                depth += 1
+                for collector in collectors:
+                    collector.handle_start(node.name, node.attrs, depth)
+                names.append(node.name)
+                stack.append(iter(node.contents))
+                break
+            node_type = type(node)
+            if node_type in text_string_types:
+                for collector in collectors:
+                    collector.handle_text(node)
+            elif node_type in raw_text_string_types:
+                for collector in collectors:
+                    collector.handle_rawtext(node)
+        else:
+            stack.pop()
+            if names:
+                name = names.pop()
+                for collector in collectors:
+                    collector.handle_end(name, depth)
+                depth -= 1
+    return collectors
+
+# 以下規則與 BeautifulSoup 的 html.parser 建樹方式相同
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer',
+}
+# 這些元素內的文字不計入 get_text()；<script>/<style> 內容以 handle_rawtext 分派
+STRING_CONTAINER_TAGS = {'rt', 'rp', 'style', 'script', 'template'}
+RAW_TEXT_TAGS = {'style', 'script'}
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+ASCII_SPACES = ' \n\t\f\r'
+NUMERIC_REFERENCE_PATTERNS = {
+    10: re.compile(r'([0-9]+)(.*)', re.DOTALL),
+    16: re.compile(r'([0-9a-f]+)(.*)', re.DOTALL),
+}
+
+class StreamingDomParser(HTMLParser):
+    """
+    不建立 DOM 樹，直接以 html.parser 的事件驅動 collector
+    
+    依 BeautifulSoup（html.parser）建樹的規則轉換事件，collector 收到的
+    事件與 visit_soup 走訪同一份文件時相同：
+    - void 元素（img、input…）開始後立即結束，多餘的結束標籤略過
+    - 結束標籤關閉到最近一個同名的開啟元素；沒有開啟中的同名元素時略過
+    - 相鄰的文字合併為一個字串，遇到標籤、註解時才分派
+    - 字元參照的解碼方式（含不完整、未知的參照）與 BeautifulSoup 相同
+    """
+    
+    def __init__(self, collectors):
+        super().__init__(convert_charrefs=False)
+        from bs4.dammit import EntitySubstitution, UnicodeDammit
+        self.entities = EntitySubstitution.HTML_ENTITY_TO_CHARACTER
+        self.numeric_character_reference = UnicodeDammit.numeric_character_reference
+        self.collectors = collectors
+        self.open_tags = []
+        self.containers = []
+        self.preserve_whitespace = 0
+        # 已自動結束的 void 元素，之後出現的結束標籤略過（以 Counter 計數，避免清單逐一比對）
+        self.already_closed = Counter()
+        self.text = []
+    
+    def _flush(self):
+        if not self.text:
+            return
+        data = ''.join(self.text)
+        self.text = []
+        if not self.preserve_whitespace and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        
+        if not self.containers:
+            for collector in self.collectors:
+                collector.handle_text(data)
+        elif self.containers[-1] in RAW_TEXT_TAGS:
+            for collector in self.collectors:
+                collector.handle_rawtext(data)
+    
+    def _start(self, tag, attrs):
+        self._flush()
+        attr_dict = {}
+        for key, value in attrs:
+            attr_dict[key] = '' if value is None else value
+        if 'class' in attr_dict:
+            attr_dict['class'] = attr_dict['class'].split()
+        if 'rel' in attr_dict and tag in ('a', 'link', 'area'):
+            attr_dict['rel'] = attr_dict['rel'].split()
+        
+        self.open_tags.append(tag)
+        if tag in STRING_CONTAINER_TAGS:
+            self.containers.append(tag)
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace += 1
+        depth = len(self.open_tags)
+        for collector in self.collectors:
+            collector.handle_start(tag, attr_dict, depth)
+    
+    def _pop_to(self, tag):
+        self._flush()
+        if tag not in self.open_tags:
+            return
+        while True:
+            depth = len(self.open_tags)
+            name = self.open_tags.pop()
+            if self.containers and name == self.containers[-1]:
+                self.containers.pop()
+            if name in PRESERVE_WHITESPACE_TAGS:
+                self.preserve_whitespace -= 1
+            for collector in self.collectors:
+                collector.handle_end(name, depth)
+            if name == tag:
+                break
+    
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._pop_to(tag)
+            self.already_closed[tag] += 1
+    
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs)
+        self._pop_to(tag)
+    
+    def handle_endtag(self, tag):
+        if self.already_closed[tag]:
+            self.already_closed[tag] -= 1
+        else:
+            self._pop_to(tag)
+    
+    def handle_data(self, data):
+        self.text.append(data)
+    
+    def handle_charref(self, name):
+        base = 10
+        if name[:1] in ('x', 'X'):
+            name, base = name[1:], 16
+        try:
+            codepoint, extra = int(name, base), ''
+        except ValueError:
+            # 缺少分號的參照：只取開頭的數字，其餘視為一般文字
+            match = NUMERIC_REFERENCE_PATTERNS[base].match(name)
+            if match is None:
+                self.text.append(name)
+                return
+            codepoint, extra = int(match.group(1), base), match.group(2)
+        self.text.append(self.numeric_character_reference(codepoint)[0])
+        self.text.append(extra)
+    
+    def handle_entityref(self, name):
+        character = self.entities.get(name)
+        self.text.append(character if character is not None else f"&{name}")
+    
+    def handle_comment(self, data):
+        self._flush()
+    
+    def handle_decl(self, decl):
+        self._flush()
+    
+    def handle_pi(self, data):
+        self._flush()
+    
+    def unknown_decl(self, data):
+        self._flush()
+        # CDATA 區段視為獨立的文字（與 BeautifulSoup 的 CData 相同）
+        if data.upper().startswith('CDATA['):
+            for collector in self.collectors:
+                collector.handle_text(data[len('CDATA['):])
+    
+    def close(self):
+        super().close()
+        self._flush()
+        # 未關閉的元素依內而外結束
+        while self.open_tags:
+            self._pop_to(self.open_tags[-1])
+
+def parse_page(html, url, parser=DEFAULT_PARSER):
+    """
+    解析頁面，同時執行所有 DOM collector 與 PageResourcesCollector
+    
+    Args:
+        parser: PARSER_BACKENDS 之一；'stream' 以 StreamingDomParser 逐事件處理，
+                不建立 DOM 樹
+    
+    Returns:
+        (頁面資料, soup)；頁面資料為 {'url', 'dom', 'stylesheets', 'inline_styles', 'links'}，
+        parser='stream' 時 soup 為 None
+    """
+    collectors = {key: cls() for key, cls in DOM_COLLECTORS.items()}
+    resources = PageResourcesCollector()
+    handlers = [*collectors.values(), resources]
+    
+    if parser == 'stream':
+        soup = None
+        stream = StreamingDomParser(handlers)
+        stream.feed(html)
+        stream.close()
+    else:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, parser)
+        visit_soup(soup, handlers)
+    
+    page = {'url': url, 'dom': {key: collector.result() for key, collector in collectors.items()}}
+    page.update(resources.result())
+    return page, soup
+
+class CachedResponse:
+    """快取或本機檔案的回應（提供分析器用到的 requests.Response 欄位）"""
+    
+    def __init__(self, entry, from_cache=True):
+        # 轉址後的最終網址（舊版快取沒有 final_url）
+        self.url = entry.get('final_url', entry['url'])
+        self.status_code = entry['status']
+        self.headers = entry['headers']
+        self.text = entry['text']
+        self.from_cache = from_cache
+    
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+class OfflineCacheMiss(Exception):
+    pass
+
+class HttpCache:
+    """
+    以 URL 為 key 的磁碟回應快取
+    
+    每個 URL 一個 JSON 檔（<sha256(url)>.json），保存內容與
+    ETag / Last-Modified，下次以條件請求重新驗證；304 時直接使用快取內容。
+    每個檔案以 temp file + rename 寫入，平行抓取時互不影響。
+    """
+    
+    def __init__(self, directory=HTTP_CACHE_DIR):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+    
+    def _path(self, url):
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+    
+    def get(self, url):
+        """回傳快取的 CachedResponse；沒有快取時回傳 None"""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return CachedResponse(entry) if entry.get('url') == url else None
+    
+    def validators(self, cached):
+        """條件請求的 headers"""
+        headers = {}
+        if cached.headers.get('ETag'):
+            headers['If-None-Match'] = cached.headers['ETag']
+        if cached.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = cached.headers['Last-Modified']
+        return headers
+    
+    def put(self, url, response):
+        entry = {
+            'url': url,
+            'final_url': response.url,
+            'status': response.status_code,
+            'headers': {key: response.headers[key]
+                        for key in ('Content-Type', 'ETag', 'Last-Modified')
+                        if key in response.headers},
+            'text': response.text,
+        }
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 每次寫入各自的唯一暫存檔：非同步路徑以多個 thread 抓取，
+        # 同一個 key（轉址與目標、多頁共用的 CSS）可能同時寫入
+        import tempfile
+        tmp = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=path.parent,
+                                          prefix=f"{path.name}.", suffix='.tmp', delete=False)
+        try:
+            with tmp:
+                json.dump(entry, tmp, ensure_ascii=False)
+            os.replace(tmp.name, path)
+        except BaseException:
+            try:
+                os.remove(tmp.name)
+            except FileNotFoundError:
+                pass
+            raise
+
+def read_text(path):
+    """
+    以 UTF-8 讀取檔案（與 requests 的 .text 相同，不轉換換行、無法解碼的位元組以 � 取代）
+    
+    大於 MMAP_THRESHOLD 的檔案（打包後的 CSS、大型頁面）以 mmap 直接解碼，
+    不先複製一份完整的 bytes，峰值記憶體約為一半。
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return f.read().decode('utf-8', errors='replace')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, 'utf-8', errors='replace')
+
+def find_dist_dir():
+    """依 DIST_CANDIDATES 尋找含 index.html 的建置輸出目錄"""
+    for candidate in DIST_CANDIDATES:
+        if (candidate / 'index.html').is_file():
+            return candidate
+    return None
+
+class LocalDist:
+    """
+    以本機的建置輸出目錄（astro-app 的 dist）取代網站，不需連線
+    
+    網址依 Astro 的 directory 格式對應檔案：
+        /               → index.html
+        /about/、/about → about/index.html（或 about.html）
+        /_astro/x.css   → _astro/x.css
+    只對應 base_url 同源的網址，且不會讀取目錄以外的檔案。
+    """
+    
+    def __init__(self, directory, base_url):
+        self.directory = Path(directory)
+        self.root = self.directory.resolve()
+        self.base_url = base_url
+        self.netloc = urlparse(base_url).netloc
+    
+    def path_for(self, url):
+        """網址對應的檔案；不存在時回傳 None"""
+        parsed = urlparse(url)
+        if parsed.netloc != self.netloc:
+            return None
+        relative = unquote(parsed.path).lstrip('/')
+        if not relative or relative.endswith('/'):
+            candidates = [relative + 'index.html']
+        else:
+            candidates = [relative, relative + '.html', relative + '/index.html']
+        for candidate in candidates:
+            path = (self.root / candidate).resolve()
+            if self.root in path.parents and path.is_file():
+                return path
+        return None
+    
+    def get(self, url):
+        path = self.path_for(url)
+        if path is None:
+            return CachedResponse({'url': url, 'status': 404, 'headers': {}, 'text': ''}, from_cache=False)
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        # 與網站相同：/about 轉址至 /about/
+        parsed = urlparse(url)
+        final_url = url
+        if path.name == 'index.html' and not unquote(parsed.path).endswith(('/', 'index.html')):
+            final_url = parsed._replace(path=parsed.path + '/').geturl()
+        return CachedResponse({
+            'url': url,
+            'final_url': final_url,
+            'status': 200,
+            'headers': {'Content-Type': content_type},
+            'text': read_text(path),
+        }, from_cache=False)
+    
+    def page_urls(self):
+        """所有 HTML 頁面的網址（首頁在前，其餘依路徑排序）"""
+        relatives = []
+        for path in self.directory.rglob('*.html'):
+            relative = path.relative_to(self.directory).as_posix()
+            if relative == 'index.html' or relative.endswith('/index.html'):
+                relative = relative[:-len('index.html')]
+            relatives.append(relative)
+        return [urljoin(self.base_url, quote(relative)) for relative in sorted(relatives)]
+
+def merge_results(a, b):
+    """
+    合併兩個頁面的分析結果
+    
+    數量相加、清單取聯集（保留順序）、dict 逐欄合併、
+    布林值取 or，其餘值保留第一個非空值。
+    """
+    if isinstance(a, dict) and isinstance(b, dict):
+        merged = dict(a)
+        for key, value in b.items():
+            merged[key] = merge_results(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(a, list) and isinstance(b, list):
+        return a + [item for item in b if item not in a]
+    if isinstance(a, bool) or isinstance(b, bool):
+        return bool(a) or bool(b)
+    if isinstance(a, int) and isinstance(b, int):
+        return a + b
+    return a if a else b
 
 class WebsiteDesignAnalyzer:
-    def __init__(self, base_url):
+    def __init__(self, base_url, concurrency=DEFAULT_CONCURRENCY, cache=None, offline=False,
+                 parser=DEFAULT_PARSER, dist=None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+        self.concurrency = concurrency
+        self.parser = parser
+        # HttpCache；offline=True 時只使用快取，不連線
+        self.cache = cache
+        self.offline = offline
+        # LocalDist；指定時從本機建置輸出讀取，不連線也不使用快取
+        self.dist = dist
+        self._session = None
         self.html_content = None
         self.soup = None
+        # 已解析的頁面（parse_page() 的頁面資料），依抓取順序；不保留 DOM 樹
+        self.pages = []
+        self._fetched_css = set()
+        self._host_limits = {}
         self.css_contents = []
         self.inline_styles = []
         
@@ -36,79 +991,304 @@ class WebsiteDesignAnalyzer:
         self.font_sizes = defaultdict(int)
         self.spacing = defaultdict(int)
         self.breakpoints = []
+        self.class_counter = Counter()
+        self._breakpoint_values = set()
+        self._css_scanned = False
+    
+    @property
+    def session(self):
+        """requests.Session；第一次連線時才建立（只分析 CSS、產生報告時不需載入 requests）"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+            })
+            # 連線池大小與並行上限一致，平行抓取時可重用連線
+            adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+        
+    def _fetch(self, url):
+        """取得回應；有快取時以條件請求重新驗證"""
+        if self.dist is not None:
+            return self.dist.get(url)
+        
+        cached = self.cache.get(url) if self.cache else None
+        if self.offline:
+            if cached is None:
+                raise OfflineCacheMiss(f"離線模式：快取中沒有 {url}")
+            self.cache.hits += 1
+            return cached
+        
+        headers = self.cache.validators(cached) if cached else {}
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT, headers=headers)
+        if cached and response.status_code == 304:
+            self.cache.hits += 1
+            return cached
         
+        response.encoding = 'utf-8'
+        if self.cache:
+            # 錯誤回應也保存，離線重跑時結果與線上一致
+            self.cache.misses += 1
+            self.cache.put(url, response)
+        return response
+    
+    def _fetch_text(self, url):
+        """以 UTF-8 取得回應內容"""
+        return self._fetch(url).text
+    
+    def _parse_page(self, html, url=None):
+        self.html_content = html
+        page, self.soup = parse_page(html, url or self.base_url, self.parser)
+        self.pages.append(page)
+        return page
+    
+    def _css_urls(self, page=None):
+        """頁面中 <link rel="stylesheet"> 的網址（依出現順序）"""
+        page = page or self.pages[-1]
+        return [urljoin(page['url'], href) for href in page['stylesheets']]
+    
+    def _collect_inline_styles(self, page=None):
+        """收集 inline styles"""
+        self.inline_styles.extend((page or self.pages[-1])['inline_styles'])
+    
     def fetch_page(self, url=None):
         """抓取網頁內容"""
         url = url or self.base_url
         print(f"正在抓取: {url}")
-        response = self.session.get(url, timeout=30)
-        response.encoding = 'utf-8'
-        self.html_content = response.text
-        self.soup = BeautifulSoup(self.html_content, 'html.parser')
-        return self.soup
+        response = self._fetch(url)
+        # 相對網址以轉址後的網址解析
+        return self._parse_page(response.text, response.url)
     
     def fetch_css_files(self):
         """抓取所有 CSS 檔案"""
-        css_links = self.soup.find_all('link', rel='stylesheet')
-        for link in css_links:
-            href = link.get('href')
-            if href:
-                css_url = urljoin(self.base_url, href)
-                try:
-                    print(f"正在抓取 CSS: {css_url}")
-                    response = self.session.get(css_url, timeout=30)
-                    response.encoding = 'utf-8'
-                    self.css_contents.append({
-                        'url': css_url,
-                        'content': response.text
-                    })
-                except Exception as e:
-                    print(f"無法抓取 CSS {css_url}: {e}")
-        
-        # 收集 inline styles
-        style_tags = self.soup.find_all('style')
-        for style in style_tags:
-            if style.string:
-                self.inline_styles.append(style.string)
+        for css_url in self._css_urls():
+            try:
+                print(f"正在抓取 CSS: {css_url}")
+                self.css_contents.append({
+                    'url': css_url,
+                    'content': self._fetch_text(css_url)
+                })
+            except Exception as e:
+                print(f"無法抓取 CSS {css_url}: {e}")
+        
+        self._collect_inline_styles()
         
         return self.css_contents
     
-    def extract_colors(self):
-        """從 CSS 提取顏色"""
-        color_patterns = [
-            r'#[0-9a-fA-F]{6}\b',
-            r'#[0-9a-fA-F]{3}\b',
-            r'rgb\s*\(\s*\d+\s*,\s*\d+\s*,\s*\d+\s*\)',
-            r'rgba\s*\(\s*\d+\s*,\s*\d+\s*,\s*\d+\s*,\s*[\d.]+\s*\)',
-        ]
+    async def _fetch_async(self, url):
+        import asyncio
+        
+        # requests 為同步 API：在 thread 中執行，並以每個主機的 semaphore 限制同時連線數
+        if not self.offline and self.dist is None:
+            # 在 event loop 的 thread 建立 session，避免多個 thread 同時建立
+            self.session
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.concurrency)
+        async with self._host_limits[host]:
+            return await asyncio.to_thread(self._fetch, url)
+    
+    async def _fetch_text_async(self, url):
+        return (await self._fetch_async(url)).text
+    
+    async def fetch_css_files_async(self, css_urls=None):
+        """
+        平行抓取 CSS 檔案；結果順序與 fetch_css_files() 相同
+        
+        已抓取過的網址直接略過，多個頁面共用的樣式表只下載、解析一次。
+        """
+        import asyncio
+        
+        if css_urls is None:
+            css_urls = self._css_urls()
+            self._collect_inline_styles()
+        css_urls = [url for url in css_urls if url not in self._fetched_css]
+        self._fetched_css.update(css_urls)
+        for css_url in css_urls:
+            print(f"正在抓取 CSS: {css_url}")
+        
+        responses = await asyncio.gather(
+            *(self._fetch_text_async(css_url) for css_url in css_urls),
+            return_exceptions=True
+        )
+        for css_url, content in zip(css_urls, responses):
+            if isinstance(content, Exception):
+                print(f"無法抓取 CSS {css_url}: {content}")
+            else:
+                self.css_contents.append({
+                    'url': css_url,
+                    'content': content
+                })
         
-        all_css = '\n'.join([css['content'] for css in self.css_contents] + self.inline_styles)
+        return self.css_contents
+    
+    async def fetch_all_async(self, url=None):
+        """抓取網頁後平行抓取其所有 CSS"""
+        url = url or self.base_url
+        self._host_limits = {}
+        print(f"正在抓取: {url}")
+        response = await self._fetch_async(url)
+        self._parse_page(response.text, response.url)
+        return await self.fetch_css_files_async()
+    
+    def _normalize_url(self, url):
+        """去除 fragment；空路徑視為 /"""
+        url, _ = urldefrag(url)
+        parsed = urlparse(url)
+        return parsed._replace(path=parsed.path or '/').geturl()
+    
+    def _page_links(self, page):
+        """頁面中同源、可能為 HTML 的連結（依出現順序）"""
+        origin = urlparse(self.base_url).netloc
+        links = []
+        for href in page['links']:
+            url = self._normalize_url(urljoin(page['url'], href))
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https') or parsed.netloc != origin:
+                continue
+            if parsed.path.lower().endswith(NON_HTML_EXTENSIONS):
+                continue
+            links.append(url)
+        return links
+    
+    async def crawl_async(self, max_pages):
+        """
+        從 base_url 以廣度優先爬取最多 max_pages 個同源頁面
+        
+        frontier 每輪取出一批網址平行抓取，依原順序處理結果並加入新連結，
+        爬取結果與順序不受網路回應先後影響。樣式表在所有頁面抓完後
+        去重、平行抓取一次。
+        頁面以轉址後的最終網址去重、解析相對連結（/contact 與 /contact/ 只分析一次）。
+        """
+        import asyncio
+        
+        self._host_limits = {}
+        start_url = self._normalize_url(self.base_url)
+        frontier = deque([start_url])
+        # seen：已排入 frontier 的網址；analyzed：已分析頁面的最終網址
+        seen = {start_url}
+        analyzed = set()
+        css_urls = []
+        
+        while frontier and len(self.pages) < max_pages:
+            batch = [frontier.popleft() for _ in range(min(len(frontier), max_pages - len(self.pages)))]
+            for url in batch:
+                print(f"正在抓取: {url}")
+            
+            responses = await asyncio.gather(
+                *(self._fetch_async(url) for url in batch), return_exceptions=True
+            )
+            for url, response in zip(batch, responses):
+                if isinstance(response, Exception):
+                    print(f"無法抓取頁面 {url}: {response}")
+                    continue
+                if not response.ok:
+                    print(f"無法抓取頁面 {url}: HTTP {response.status_code}")
+                    continue
+                if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                    continue
+                
+                final_url = self._normalize_url(response.url)
+                seen.add(final_url)
+                if final_url in analyzed:
+                    continue
+                analyzed.add(final_url)
+                
+                page = self._parse_page(response.text, final_url)
+                css_urls.extend(self._css_urls(page))
+                self._collect_inline_styles(page)
+                
+                for link in self._page_links(page):
+                    if link not in seen:
+                        seen.add(link)
+                        frontier.append(link)
         
-        for pattern in color_patterns:
-            matches = re.findall(pattern, all_css, re.IGNORECASE)
-            for match in matches:
-                self.colors[match.lower().replace(' ', '')] += 1
+        return await self.fetch_css_files_async(list(dict.fromkeys(css_urls)))
+    
+    def load_dist(self, max_pages=None):
+        """
+        讀取本機建置輸出的所有頁面（最多 max_pages 頁）與其樣式表
+        
+        直接列出目錄中的 HTML 檔，不依連結爬取；樣式表依首次出現的順序
+        去重，每個檔案只讀取、解析一次。
+        """
+        css_urls = []
+        for url in self.dist.page_urls()[:max_pages]:
+            print(f"正在讀取: {url}")
+            page = self._parse_page(self._fetch_text(url), url)
+            css_urls.extend(self._css_urls(page))
+            self._collect_inline_styles(page)
+        
+        for css_url in dict.fromkeys(css_urls):
+            response = self._fetch(css_url)
+            if not response.ok:
+                print(f"找不到 CSS: {css_url}")
+                continue
+            self.css_contents.append({
+                'url': css_url,
+                'content': response.text
+            })
         
+        return self.css_contents
+    
+    def _stylesheets(self):
+        """依序產出所有樣式表內容（不串接）"""
+        for css in self.css_contents:
+            yield css['content']
+        yield from self.inline_styles
+    
+    def scan_css(self):
+        """單次走訪所有樣式表，同時累計色彩、字型、間距、斷點與類別"""
+        if self._css_scanned:
+            return
+        self._css_scanned = True
+        
+        # 屬性名稱 → 對應的計數器（每個屬性名稱只判斷一次）
+        counters = {}
+        
+        def counter_for(prop):
+            if prop.endswith('font-family'):
+                return self.fonts
+            if prop.endswith('font-size'):
+                return self.font_sizes
+            if SPACING_PROPERTY_PATTERN.search(prop):
+                return self.spacing
+            return None
+        
+        for css in self._stylesheets():
+            for token in tokenize_css(css):
+                kind = token[0]
+                if kind == 'declaration':
+                    _, prop, value = token
+                    if '#' in value or 'rgb' in value or 'RGB' in value:
+                        for match in COLOR_PATTERN.findall(value):
+                            self.colors[match.lower().replace(' ', '')] += 1
+                    if prop not in counters:
+                        counters[prop] = counter_for(prop)
+                    counter = counters[prop]
+                    if counter is self.fonts:
+                        self.fonts[value.strip('"\'')] += 1
+                    elif counter is not None:
+                        counter[value] += 1
+                elif kind == 'selector':
+                    self.class_counter.update(CLASS_SELECTOR_PATTERN.findall(token[1]))
+                elif token[1] == 'media':
+                    self._breakpoint_values.update(int(px) for px in PX_PATTERN.findall(token[2]))
+    
+    def extract_colors(self):
+        """從 CSS 提取顏色"""
+        self.scan_css()
         return dict(sorted(self.colors.items(), key=lambda x: x[1], reverse=True))
     
     def extract_fonts(self):
         """從 CSS 提取字型"""
-        all_css = '\n'.join([css['content'] for css in self.css_contents] + self.inline_styles)
-        
-        # font-family
-        font_pattern = r'font-family\s*:\s*([^;]+)'
-        matches = re.findall(font_pattern, all_css, re.IGNORECASE)
-        for match in matches:
-            font = match.strip().strip('"\'')
-            self.fonts[font] += 1
-        
-        # font-size
-        size_pattern = r'font-size\s*:\s*([^;]+)'
-        matches = re.findall(size_pattern, all_css, re.IGNORECASE)
-        for match in matches:
-            size = match.strip()
-            self.font_sizes[size] += 1
-        
+        self.scan_css()
         return {
             'families': dict(sorted(self.fonts.items(), key=lambda x: x[1], reverse=True)),
             'sizes': dict(sorted(self.font_sizes.items(), key=lambda x: x[1], reverse=True))
@@ -116,161 +1296,36 @@ class WebsiteDesignAnalyzer:
     
     def extract_spacing(self):
         """從 CSS 提取間距值"""
-        all_css = '\n'.join([css['content'] for css in self.css_contents] + self.inline_styles)
-        
-        spacing_patterns = [
-            r'(?:margin|padding)(?:-(?:top|right|bottom|left))?\s*:\s*([^;]+)',
-            r'gap\s*:\s*([^;]+)',
-        ]
-        
-        for pattern in spacing_patterns:
-            matches = re.findall(pattern, all_css, re.IGNORECASE)
-            for match in matches:
-                self.spacing[match.strip()] += 1
-        
+        self.scan_css()
         return dict(sorted(self.spacing.items(), key=lambda x: x[1], reverse=True)[:30])
     
     def extract_breakpoints(self):
         """從 CSS 提取響應式斷點"""
-        all_css = '\n'.join([css['content'] for css in self.css_contents] + self.inline_styles)
-        
-        media_pattern = r'@media[^{]+\{([^{}]*(?:\{[^{}]*\}[^{}]*)*)\}'
-        query_pattern = r'@media\s+([^{]+)'
-        
-        queries = re.findall(query_pattern, all_css, re.IGNORECASE)
-        breakpoint_values = []
-        
-        for query in queries:
-            # Extract pixel values
-            px_matches = re.findall(r'(\d+)px', query)
-            for px in px_matches:
-                breakpoint_values.append(int(px))
-        
-        self.breakpoints = sorted(set(breakpoint_values))
+        self.scan_css()
+        self.breakpoints = sorted(self._breakpoint_values)
         return self.breakpoints
     
+    def _collect(self, key):
+        """目前頁面（最後解析的頁面）的 collector 結果"""
+        return self.pages[-1]['dom'][key]
+    
     def analyze_navigation(self):
         """分析導覽結構"""
-        nav_info = {
-            'main_nav': [],
-            'sub_nav': [],
-            'footer_nav': [],
-            'breadcrumb': None
-        }
-        
-        # 主選單
-        header = self.soup.find('header') or self.soup.find('nav') or self.soup.find(class_=re.compile(r'header|nav', re.I))
-        if header:
-            links = header.find_all('a')
-            for link in links[:20]:  # 限制數量
-                nav_info['main_nav'].append({
-                    'text': link.get_text(strip=True)[:50],
-                    'href': link.get('href', '')
-                })
-        
-        # 頁尾
-        footer = self.soup.find('footer') or self.soup.find(class_=re.compile(r'footer', re.I))
-        if footer:
-            links = footer.find_all('a')
-            for link in links[:20]:
-                nav_info['footer_nav'].append({
-                    'text': link.get_text(strip=True)[:50],
-                    'href': link.get('href', '')
-                })
-        
-        # 麵包屑
-        breadcrumb = self.soup.find(class_=re.compile(r'breadcrumb', re.I))
-        if breadcrumb:
-            nav_info['breadcrumb'] = breadcrumb.get_text(strip=True)[:200]
-        
-        return nav_info
+        return self._collect('navigation')
     
     def analyze_ui_components(self):
         """分析 UI 元件"""
-        components = {
-            'buttons': [],
-            'forms': [],
-            'cards': [],
-            'images': [],
-            'icons': []
-        }
-        
-        # 按鈕
-        buttons = self.soup.find_all(['button', 'a'])
-        btn_classes = set()
-        for btn in buttons:
-            classes = btn.get('class', [])
-            if classes:
-                for cls in classes:
-                    if 'btn' in cls.lower() or 'button' in cls.lower():
-                        btn_classes.add(cls)
-        components['buttons'] = list(btn_classes)[:20]
-        
-        # 表單
-        forms = self.soup.find_all('form')
-        for form in forms[:5]:
-            form_info = {
-                'action': form.get('action', ''),
-                'method': form.get('method', ''),
-                'inputs': len(form.find_all(['input', 'textarea', 'select']))
-            }
-            components['forms'].append(form_info)
-        
-        # 圖片
-        images = self.soup.find_all('img')
-        for img in images[:20]:
-            components['images'].append({
-                'src': img.get('src', '')[:100],
-                'alt': img.get('alt', '')[:50],
-                'class': ' '.join(img.get('class', []))
-            })
-        
-        # 圖示 (font icons, svg)
-        icons = self.soup.find_all(class_=re.compile(r'icon|fa-|bi-', re.I))
-        icon_classes = set()
-        for icon in icons:
-            classes = icon.get('class', [])
-            icon_classes.update(classes)
-        components['icons'] = list(icon_classes)[:30]
-        
-        return components
+        return self._collect('ui_components')
     
     def analyze_layout(self):
         """分析版面結構"""
-        layout = {
-            'sections': [],
-            'grid_classes': [],
-            'container_classes': []
-        }
-        
-        # 區塊
-        sections = self.soup.find_all(['section', 'div'], class_=re.compile(r'section|container|wrapper|row|col', re.I))
-        section_classes = set()
-        for section in sections:
-            classes = section.get('class', [])
-            section_classes.update(classes)
-        
-        layout['sections'] = list(section_classes)[:30]
-        
-        # Grid 相關類別
-        grid_elements = self.soup.find_all(class_=re.compile(r'grid|row|col|flex', re.I))
-        grid_classes = set()
-        for elem in grid_elements:
-            classes = elem.get('class', [])
-            grid_classes.update(classes)
-        layout['grid_classes'] = list(grid_classes)[:30]
-        
-        return layout
+        return self._collect('layout')
     
     def extract_css_classes(self):
         """提取 CSS 類別命名慣例"""
-        all_css = '\n'.join([css['content'] for css in self.css_contents] + self.inline_styles)
-        
-        # 提取所有 class 選擇器
-        class_pattern = r'\.([a-zA-Z_-][a-zA-Z0-9_-]*)'
-        matches = re.findall(class_pattern, all_css)
-        
-        class_counter = Counter(matches)
+        # 選擇器中的 class（由 scan_css() 累計）
+        self.scan_css()
+        class_counter = self.class_counter
         
         # 分類
         categorized = {
@@ -303,83 +1358,62 @@ class WebsiteDesignAnalyzer:
     
     def analyze_typography_hierarchy(self):
         """分析文字層級"""
-        hierarchy = {}
-        
-        for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'span', 'a']:
-            elements = self.soup.find_all(tag)
-            if elements:
-                sample_texts = []
-                classes = set()
-                for elem in elements[:5]:
-                    text = elem.get_text(strip=True)[:100]
-                    if text:
-                        sample_texts.append(text)
-                    elem_classes = elem.get('class', [])
-                    classes.update(elem_classes)
-                
-                hierarchy[tag] = {
-                    'count': len(elements),
-                    'sample_classes': list(classes)[:10],
-                    'samples': sample_texts[:3]
-                }
-        
-        return hierarchy
+        return self._collect('typography_hierarchy')
     
     def analyze_accessibility(self):
         """分析無障礙設計"""
-        a11y = {
-            'images_with_alt': 0,
-            'images_without_alt': 0,
-            'aria_labels': [],
-            'form_labels': 0,
-            'skip_links': False,
-            'lang_attribute': None,
-            'semantic_elements': {}
+        return self._collect('accessibility')
+    
+    def _analyze_pages(self):
+        """
+        合併所有頁面的 DOM 分析結果
+        
+        每個頁面在解析時已走訪一次 DOM、執行所有 collector（見 parse_page()），
+        多個頁面的結果以 merge_results() 合併，再套用各 collector 的清單上限。
+        """
+        merged = {}
+        for page in self.pages:
+            for key, result in page['dom'].items():
+                merged[key] = merge_results(merged[key], result) if key in merged else result
+        return {key: DOM_COLLECTORS[key].limit(result) for key, result in merged.items()}
+    
+    def generate_css_report(self):
+        """只含 CSS 設計元素的報告（css 子命令使用，不需抓取、解析頁面）"""
+        return {
+            'colors': self.extract_colors(),
+            'fonts': self.extract_fonts(),
+            'spacing': self.extract_spacing(),
+            'breakpoints': self.extract_breakpoints(),
+            'css_classes': self.extract_css_classes()
         }
-        
-        # 圖片 alt
-        images = self.soup.find_all('img')
-        for img in images:
-            if img.get('alt'):
-                a11y['images_with_alt'] += 1
-            else:
-                a11y['images_without_alt'] += 1
-        
-        # ARIA
-        aria_elements = self.soup.find_all(attrs={'aria-label': True})
-        for elem in aria_elements[:10]:
-            a11y['aria_labels'].append(elem.get('aria-label'))
-        
-        # 表單標籤
-        labels = self.soup.find_all('label')
-        a11y['form_labels'] = len(labels)
-        
-        # 跳過連結
-        skip = self.soup.find(attrs={'href': '#main'}) or self.soup.find(class_=re.compile(r'skip', re.I))
-        a11y['skip_links'] = skip is not None
-        
-        # 語言屬性
-        html_tag = self.soup.find('html')
-        if html_tag:
-            a11y['lang_attribute'] = html_tag.get('lang')
-        
-        # 語意化元素
-        for tag in ['header', 'nav', 'main', 'article', 'section', 'aside', 'footer']:
-            count = len(self.soup.find_all(tag))
-            if count > 0:
-                a11y['semantic_elements'][tag] = count
-        
-        return a11y
     
-    def generate_report(self):
-        """生成完整分析報告"""
+    def generate_report(self, use_async=False, max_pages=None):
+        """
+        生成完整分析報告
+        
+        use_async=True 時平行抓取 CSS；max_pages > 1 時爬取同源頁面，
+        彙整所有頁面的色彩、字型、間距與元件（隱含 use_async）。
+        指定 dist 時改為讀取本機建置輸出的頁面，max_pages 預設為不限；
+        否則預設只分析首頁。
+        """
         print("\n" + "="*60)
         print("開始分析網站設計...")
         print("="*60 + "\n")
         
         # 抓取資料
-        self.fetch_page()
-        self.fetch_css_files()
+        if self.dist is None:
+            max_pages = max_pages or 1
+        
+        if self.dist is not None:
+            self.load_dist(max_pages)
+        elif max_pages > 1 or use_async:
+            import asyncio
+            asyncio.run(self.crawl_async(max_pages) if max_pages > 1 else self.fetch_all_async())
+        else:
+            self.fetch_page()
+            self.fetch_css_files()
+        
+        dom = self._analyze_pages()
         
         report = {
             'url': self.base_url,
@@ -387,14 +1421,19 @@ class WebsiteDesignAnalyzer:
             'fonts': self.extract_fonts(),
             'spacing': self.extract_spacing(),
             'breakpoints': self.extract_breakpoints(),
-            'navigation': self.analyze_navigation(),
-            'ui_components': self.analyze_ui_components(),
-            'layout': self.analyze_layout(),
+            'navigation': dom['navigation'],
+            'ui_components': dom['ui_components'],
+            'layout': dom['layout'],
             'css_classes': self.extract_css_classes(),
-            'typography_hierarchy': self.analyze_typography_hierarchy(),
-            'accessibility': self.analyze_accessibility()
+            'typography_hierarchy': dom['typography_hierarchy'],
+            'accessibility': dom['accessibility']
         }
         
+        if self.dist is not None:
+            report['source'] = str(self.dist.directory)
+        if self.dist is not None or max_pages > 1:
+            report['pages'] = [page['url'] for page in self.pages]
+        
         return report
     
     def format_markdown_report(self, report):
@@ -403,6 +1442,10 @@ class WebsiteDesignAnalyzer:
         
         md.append("# 鎰威科技網站設計規範指南")
         md.append(f"\n**分析網址**: {report['url']}")
+        if report.get('source'):
+            md.append(f"**分析來源**: `{report['source']}`（本機建置輸出）")
+        if report.get('pages'):
+            md.append(f"**分析頁數**: {len(report['pages'])}")
         md.append(f"**分析日期**: 2026-01-06")
         md.append("\n---\n")
         
@@ -569,25 +1612,356 @@ class WebsiteDesignAnalyzer:
         return '\n'.join(md)
 
 
-def main():
-    analyzer = WebsiteDesignAnalyzer(BASE_URL)
-    report = analyzer.generate_report()
+# diff 比較的設計 token：(名稱, 報告中的路徑)
+DIFF_TOKEN_GROUPS = [
+    ('colors', ('colors',)),
+    ('font_families', ('fonts', 'families')),
+    ('font_sizes', ('fonts', 'sizes')),
+    ('spacing', ('spacing',)),
+    ('breakpoints', ('breakpoints',)),
+]
+# 佔比的相對變化達此值才列為頻率變化（0.25 = ±25%）
+DEFAULT_MIN_SHIFT = 0.25
+
+def token_counters(report):
+    """
+    報告（analyze 或 css 子命令產生）中各組設計 token 的 Counter
+    
+    回傳 {名稱: (Counter, 是否有頻率)}；breakpoints 為清單，每個值計 1 次、
+    只比較增減。spacing 在報告中只保留前 30 名。
+    """
+    counters = {}
+    for group, path in DIFF_TOKEN_GROUPS:
+        value = report
+        for key in path:
+            value = value.get(key) or {}
+        if isinstance(value, list):
+            counters[group] = (Counter(str(token) for token in value), False)
+        else:
+            counters[group] = (+Counter(value), True)
+    return counters
+
+def diff_counters(old, new, min_shift=DEFAULT_MIN_SHIFT):
+    """
+    比較兩個 Counter：新增、移除與頻率變化的 token
+    
+    兩份報告的頁數、CSS 大小可能不同，頻率以佔該組總數的比例比較；
+    數量不變的 token 不列入（只因其他 token 增減而改變佔比）。
+    min_shift 為 None 時不比較頻率。各項依數量（變化幅度）由大到小排序。
+    """
+    common = old.keys() & new.keys()
+    shifted = []
+    if min_shift is not None:
+        old_total = sum(old.values())
+        new_total = sum(new.values())
+        for token in common:
+            if old[token] == new[token]:
+                continue
+            change = (new[token] / new_total) / (old[token] / old_total) - 1
+            if abs(change) >= min_shift:
+                shifted.append({'token': token, 'old': old[token], 'new': new[token], 'change': round(change, 3)})
+    shifted.sort(key=lambda item: (-abs(item['change']), item['token']))
+    
+    return {
+        'added': {token: new[token] for token in sorted(new.keys() - common, key=lambda t: (-new[t], t))},
+        'removed': {token: old[token] for token in sorted(old.keys() - common, key=lambda t: (-old[t], t))},
+        'shifted': shifted,
+        'unchanged': len(common) - len(shifted),
+    }
+
+def diff_reports(old, new, min_shift=DEFAULT_MIN_SHIFT, old_name=None, new_name=None):
+    """
+    比較兩份報告的設計 token，回傳各組差異與總計
+    
+    報告沒有來源網址時（css 子命令產生）以 old_name / new_name（報告檔路徑）標示。
+    """
+    old_counters = token_counters(old)
+    new_counters = token_counters(new)
+    groups = {}
+    for group, (old_counter, has_frequency) in old_counters.items():
+        new_counter = new_counters[group][0]
+        groups[group] = diff_counters(old_counter, new_counter, min_shift if has_frequency else None)
+    
+    return {
+        'old': old.get('source') or old.get('url') or old_name,
+        'new': new.get('source') or new.get('url') or new_name,
+        'min_shift': min_shift,
+        'summary': {kind: sum(len(diff[kind]) for diff in groups.values())
+                    for kind in ('added', 'removed', 'shifted')},
+        'groups': groups,
+    }
+
+def format_diff(diff, limit=10):
+    """精簡的文字差異報告（每組每類最多 limit 項）"""
+    lines = [
+        "🎨 設計 token 差異",
+        f"   舊: {diff['old']}",
+        f"   新: {diff['new']}",
+        "-" * 60,
+    ]
+    for group, changes in diff['groups'].items():
+        lines.append(f"{group:<14} +{len(changes['added']):<4} -{len(changes['removed']):<4} "
+                     f"~{len(changes['shifted']):<4}（不變 {changes['unchanged']}）")
+        for token, count in list(changes['added'].items())[:limit]:
+            lines.append(f"   + {token} ({count})")
+        for token, count in list(changes['removed'].items())[:limit]:
+            lines.append(f"   - {token} ({count})")
+        for item in changes['shifted'][:limit]:
+            lines.append(f"   ~ {item['token']} {item['old']} → {item['new']}（佔比 {item['change']:+.0%}）")
+    
+    summary = diff['summary']
+    total = sum(summary.values())
+    lines.append("-" * 60)
+    if total:
+        lines.append(f"⚠️  {total} 項差異：新增 {summary['added']}、移除 {summary['removed']}、"
+                     f"頻率變化 {summary['shifted']}（佔比 ±{diff['min_shift']:.0%} 以上）")
+    else:
+        lines.append("✅ 設計 token 沒有差異")
+    return '\n'.join(lines)
+
+
+# 子命令：analyze（預設）抓取並分析網站、css 只分析本機 CSS 檔、report 由 JSON 重新產生 Markdown、
+# diff 比較兩份報告的設計 token
+COMMANDS = ('analyze', 'css', 'report', 'diff')
+
+# pip 套件名稱與 import 名稱不同者
+PIP_NAMES = {'bs4': 'beautifulsoup4'}
+
+def command_dependencies(args):
+    """子命令實際需要載入的套件（依參數決定）"""
+    if args.command != 'analyze':
+        return []
+    names = []
+    # --dist 從本機檔案讀取：不需 asyncio、requests
+    if args.dist is None:
+        if args.use_async or (args.max_pages or 1) > 1:
+            names.append('asyncio')
+        if not args.offline:
+            names.append('requests')
+    # stream 不建樹，但字元參照的解碼沿用 bs4.dammit
+    names.append('bs4')
+    if args.parser == 'lxml':
+        names.append('lxml.etree')
+    return names
+
+def load_dependencies(names):
+    """
+    依序載入套件，回傳 {套件: 載入秒數}
+    
+    之後函式內的 import 直接取用 sys.modules，不再計入。
+    """
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+def print_import_time(command, main_start, timings):
+    total = time.perf_counter() - MODULE_START
+    print(f"⏱️  啟動時間（{command}）: {total * 1000:.1f} ms")
+    print(f"   模組本身: {(main_start - MODULE_START) * 1000:.1f} ms")
+    for name, seconds in timings.items():
+        print(f"   {name}: {seconds * 1000:.1f} ms")
+    print("   （不含直譯器啟動；逐模組明細可用 python3 -X importtime）")
+
+def run_analyze(args, parser):
+    if args.dist is not None:
+        dist_dir = Path(args.dist) if args.dist else find_dist_dir()
+        if dist_dir is None:
+            print(f"❌ 找不到建置輸出（{', '.join(map(str, DIST_CANDIDATES))}），請先執行 npm run build 或指定目錄")
+            sys.exit(1)
+        if not dist_dir.is_dir():
+            print(f"❌ 目錄不存在: {dist_dir}")
+            sys.exit(1)
+        analyzer = WebsiteDesignAnalyzer(BASE_URL, parser=args.parser, dist=LocalDist(dist_dir, BASE_URL))
+        report = analyzer.generate_report(max_pages=args.max_pages)
+    else:
+        if args.offline and args.no_cache:
+            parser.error('--offline 需要快取，不可與 --no-cache 同時使用')
+        cache = None if args.no_cache else HttpCache(args.cache_dir)
+        
+        analyzer = WebsiteDesignAnalyzer(BASE_URL, concurrency=max(1, args.concurrency),
+                                         cache=cache, offline=args.offline, parser=args.parser)
+        report = analyzer.generate_report(use_async=args.use_async, max_pages=args.max_pages)
+        if cache:
+            print(f"快取: 命中 {cache.hits}、重新下載 {cache.misses}")
+    
+    args.output_dir.mkdir(parents=True, exist_ok=True)
     
     # 輸出 JSON 報告
-    json_path = '/Users/ericcai/project/ewill-legacy-assets/docs/design-analysis.json'
+    json_path = args.output_dir / REPORT_JSON_NAME
     with open(json_path, 'w', encoding='utf-8') as f:
         json.dump(report, f, ensure_ascii=False, indent=2)
     print(f"\nJSON 報告已儲存至: {json_path}")
     
     # 輸出 Markdown 報告
     md_content = analyzer.format_markdown_report(report)
-    md_path = '/Users/ericcai/project/ewill-legacy-assets/docs/DESIGN_GUIDELINE.md'
+    md_path = args.output_dir / REPORT_MARKDOWN_NAME
     with open(md_path, 'w', encoding='utf-8') as f:
         f.write(md_content)
     print(f"Markdown 報告已儲存至: {md_path}")
     
     print("\n分析完成！")
 
+def run_css(args):
+    for path in args.files:
+        if not path.is_file():
+            print(f"❌ 檔案不存在: {path}")
+            sys.exit(1)
+    
+    analyzer = WebsiteDesignAnalyzer(BASE_URL)
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            analyzer.css_contents.append({'url': str(path), 'content': f.read()})
+    report = analyzer.generate_css_report()
+    
+    if args.output is None:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ CSS 報告已儲存至: {args.output}（{len(args.files)} 個檔案、{len(report['colors'])} 種顏色）")
+
+def run_report(args):
+    if not args.json.is_file():
+        print(f"❌ 檔案不存在: {args.json}")
+        sys.exit(1)
+    
+    with open(args.json, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    missing = missing_report_keys(report)
+    if missing:
+        print(f"❌ report only accepts analyze JSON：{args.json} 缺少 {', '.join(missing)}"
+              f"（css 子命令的報告不含網址與 DOM 區段）")
+        sys.exit(1)
+    md_path = args.output or args.json.with_name(REPORT_MARKDOWN_NAME)
+    
+    md_content = WebsiteDesignAnalyzer(report['url']).format_markdown_report(report)
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write(md_content)
+    print(f"✅ Markdown 報告已儲存至: {md_path}")
+
+def run_diff(args):
+    for path in (args.old, args.new):
+        if not path.is_file():
+            print(f"❌ 檔案不存在: {path}")
+            sys.exit(1)
+    
+    with open(args.old, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    diff = diff_reports(old, new, args.min_shift / 100, old_name=str(args.old), new_name=str(args.new))
+    print(format_diff(diff, args.limit))
+    
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(diff, f, ensure_ascii=False, indent=2)
+        print(f"✅ 差異報告已儲存至: {args.output}")
+    
+    if args.check and any(diff['summary'].values()):
+        sys.exit(1)
+
+def main():
+    main_start = time.perf_counter()
+    import argparse
+    
+    # 共用參數
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--import-time', action='store_true',
+                        help='只量測啟動時間（載入此子命令需要的套件）後結束')
+    
+    parser = argparse.ArgumentParser(
+        description='分析網站設計架構與風格規範',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例：
+  python3 analyze_website_design.py --async --max-pages 20    # 預設子命令 analyze
+  python3 analyze_website_design.py --dist --parser stream    # 分析 astro-app 的建置輸出
+  python3 analyze_website_design.py css dist/_astro/*.css -o css.json
+  python3 analyze_website_design.py report docs/design-analysis.json
+  python3 analyze_website_design.py diff legacy.json .cache/design-report/design-analysis.json --check
+  python3 analyze_website_design.py css --import-time        # 量測冷啟動時間
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='{analyze,css,report,diff}')
+    
+    analyze = subparsers.add_parser('analyze', parents=[common], help='抓取並分析網站（預設）')
+    analyze.add_argument('--async', dest='use_async', action='store_true',
+                         help='以 asyncio 平行抓取 CSS（結果與序列模式相同）')
+    analyze.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                         help=f'平行抓取時每個主機的同時連線數上限（預設 {DEFAULT_CONCURRENCY}）')
+    analyze.add_argument('--max-pages', type=int,
+                         help='爬取同源頁面並彙整分析，最多 N 頁（預設只分析首頁；--dist 時預設為所有頁面）')
+    analyze.add_argument('--dist', nargs='?', const='', metavar='DIR',
+                         help='從本機建置輸出讀取 HTML 與 CSS，不連線'
+                              f"（未指定目錄時依序尋找 {', '.join(map(str, DIST_CANDIDATES))}）")
+    analyze.add_argument('--output-dir', type=Path, default=REPORT_DIR,
+                         help=f'JSON 與 Markdown 報告的輸出目錄（預設 {REPORT_DIR}）')
+    analyze.add_argument('--no-cache', action='store_true',
+                         help='不使用磁碟快取，每次重新下載')
+    analyze.add_argument('--cache-dir', type=Path, default=HTTP_CACHE_DIR,
+                         help=f'快取目錄（預設 {HTTP_CACHE_DIR}）')
+    analyze.add_argument('--offline', action='store_true',
+                         help='離線模式：只使用快取內容，不連線')
+    analyze.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                         help=f'HTML 解析方式（預設 {DEFAULT_PARSER}；stream 不建立 DOM 樹）')
+    
+    css = subparsers.add_parser('css', parents=[common], help='只分析本機 CSS 檔（不連線）')
+    css.add_argument('files', nargs='*', type=Path, help='CSS 檔案')
+    css.add_argument('-o', '--output', type=Path, help='JSON 輸出路徑（預設輸出至 stdout）')
+    
+    report = subparsers.add_parser('report', parents=[common], help='由 JSON 報告重新產生 Markdown')
+    report.add_argument('json', type=Path, help='analyze 產生的 JSON 報告')
+    report.add_argument('-o', '--output', type=Path,
+                        help='Markdown 輸出路徑（預設為 JSON 同目錄的 DESIGN_GUIDELINE.md）')
+    
+    diff = subparsers.add_parser('diff', parents=[common], help='比較兩份報告的設計 token')
+    diff.add_argument('old', type=Path, help='比較基準的 JSON 報告（例如舊網站）')
+    diff.add_argument('new', type=Path, help='要比較的 JSON 報告（例如 astro-app 建置輸出）')
+    diff.add_argument('-o', '--output', type=Path, help='另存完整差異的 JSON')
+    diff.add_argument('--min-shift', type=float, default=DEFAULT_MIN_SHIFT * 100, metavar='PCT',
+                      help=f'佔比變化達 PCT%% 才列為頻率變化（預設 {DEFAULT_MIN_SHIFT * 100:.0f}）')
+    diff.add_argument('--limit', type=int, default=10,
+                      help='每組每類最多列出幾項（預設 10；完整內容見 -o）')
+    diff.add_argument('--check', action='store_true',
+                      help='有差異時以結束碼 1 結束（CI 用）')
+    
+    # 未指定子命令時為 analyze（與舊版的參數相容）
+    argv = sys.argv[1:]
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv = ['analyze', *argv]
+    args = parser.parse_args(argv)
+    
+    if args.command == 'analyze' and args.parser == 'lxml' and not HAS_LXML:
+        print("❌ --parser lxml 需要 lxml：pip install lxml")
+        sys.exit(1)
+    if args.command == 'css' and not args.files and not args.import_time:
+        css.error('請指定 CSS 檔案')
+    if args.command == 'diff' and args.min_shift <= 0:
+        diff.error('--min-shift 必須大於 0')
+    
+    try:
+        timings = load_dependencies(command_dependencies(args))
+    except ImportError as e:
+        print(f"❌ 需要 {e.name}：pip install {PIP_NAMES.get(e.name, e.name)}")
+        sys.exit(1)
+    
+    if args.import_time:
+        print_import_time(args.command, main_start, timings)
+        return
+    
+    if args.command == 'css':
+        run_css(args)
+    elif args.command == 'report':
+        run_report(args)
+    elif args.command == 'diff':
+        run_diff(args)
+    else:
+        run_analyze(args, analyze)
+
 
 if __name__ == '__main__':
     main()
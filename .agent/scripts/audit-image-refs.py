@@ -11,20 +11,59 @@ audit-image-refs.py - 稽核頁面圖片引用完整性
 - index.md 是 source of truth（包含圖片引用）
 - index.yml 的 layout.sections 由 sync-content.ts 自動生成
 - 此腳本僅作稽核用途，不會修改任何檔案
+- 孤兒檔案：assets/ 中沒有被 index.md 連結的圖片（assets/、./assets/、
+  ./images/ 皆算引用；README、腳本等非圖片檔不計）。
+  被引用圖片的描述檔 variants（desktop/mobile）視為已引用；描述檔的 id
+  出現在 astro-app/src（模板以 image_id 引用）時也視為已引用。
+  容量取自索引的 stat 資料，不讀取圖片內容
 
 使用方式：
-  python3 .agent/scripts/audit-image-refs.py [--page PAGE_NAME] [--verbose]
+  python3 .agent/scripts/audit-image-refs.py [--page PAGE_NAME] [--verbose] [--jobs N]
 
 選項：
   --page      只檢查指定頁面
   --verbose   顯示詳細資訊
+  --jobs      以 N 個 worker process 平行稽核（預設 1，即序列執行）
+  --no-cache  忽略 .cache/image-audit.json，全部重新稽核
+  --format    輸出格式：text（預設）、json、ndjson
+  --orphans   列出未被 index.md 或 astro-app/src 引用的圖片（孤兒檔案）與可回收容量
+  --dupes     找出跨頁面內容完全相同的圖片（重複檔案）與浪費容量
+  --image-budget SIZE  單張引用圖片的容量上限（例如 500KB）
+  --page-budget SIZE   單頁引用圖片的總容量上限（例如 3MB）
+  --budget-level       超出預算時的狀態：error（預設，非零結束）或 warning
+
+容量預算：
+- 只計算 index.md 實際引用的 assets（同一檔案引用多次只算一次）
+- 容量取自索引的 stat 資料；預算檢查在快取之後套用，調整預算不需重新稽核
+
+重複檔案偵測：
+- 先依檔案大小分組（stat 資料），只有同大小的檔案才計算 hash
+- hash 以 1 MB 區塊串流計算，不一次載入整個檔案
+- hash 存於 .cache/image-hashes.json（以 size + mtime 驗證），重複執行幾乎無成本
+
+機器可讀輸出：
+- json：全部稽核完成後輸出 {"pages": [...], "summary": {...}}
+- ndjson：每稽核完一頁立即輸出一行 {"type": "page", ...}，
+  最後一行為 {"type": "summary", ...}
+- 結束代碼與 text 模式相同（有錯誤時為 1）
+
+增量快取：
+- 每頁的 audit_page() 結果存於 .cache/image-audit.json
+- 以 index.md / index.yml 的 (mtime, size, 內容 hash) 與 assets/ 檔名清單為 key
+- 只有指紋變更的頁面才會重新稽核
 """
 
+import hashlib
+import json
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from content_index import FileEntry, PageEntry, build_index
+
 # 嘗試載入 yaml，若無則使用 regex fallback
 try:
     import yaml
@@ -32,19 +71,27 @@ try:
 except ImportError:
     HAS_YAML = False
 
-
-def extract_md_image_refs(md_path: Path) -> list:
-    """從 markdown 內容提取圖片引用"""
-    if not md_path.exists():
-        return []
-
-    with open(md_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    pattern = r'!\[([^\]]*)\]\(assets/([^)]+)\)'
-    matches = re.findall(pattern, content)
-
-    return [{'alt': alt, 'filename': filename} for alt, filename in matches]
+CACHE_PATH = Path('.cache') / 'image-audit.json'
+HASH_CACHE_PATH = Path('.cache') / 'image-hashes.json'
+HASH_CHUNK_SIZE = 1024 * 1024
+# audit_page() 的判斷邏輯變更時需遞增，使舊快取失效
+CACHE_VERSION = 4
+
+# 以描述檔 id 引用圖片的前端原始碼（孤兒檔案判斷用）
+SOURCE_DIR = Path('astro-app') / 'src'
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.mjs', '.astro', '.vue', '.json', '.md', '.mdx', '.yml', '.yaml')
+
+VARIANTS_BLOCK_PATTERN = re.compile(r'^variants:[ \t]*\n((?:[ \t]+.*(?:\n|$))*)', re.MULTILINE)
+VARIANT_VALUE_PATTERN = re.compile(r'^[ \t]+\w+:[ \t]*[\'"]?([^\'"\n]+?)[\'"]?[ \t]*$', re.MULTILINE)
+SIDECAR_ID_PATTERN = re.compile(r'^id:[ \t]*[\'"]?([^\'"\n#]+?)[\'"]?[ \t]*$', re.MULTILINE)
+# 模板引用描述檔 id 的寫法（只比對這些，避免 logo、icon 等一般字串誤判為已引用）：
+#   getAssetById('logo')
+#   image_id: 'x'、cover_image_id="x"、heroImageId = a || 'x'
+#   images: { hero: 'x', ... } / images: [ { image_id: 'x' } ]（id: 鍵除外）
+ASSET_CALL_PATTERN = re.compile(r'getAssetById\(\s*([\'"`])([\w-]+)\1')
+IMAGE_ID_KEY_PATTERN = re.compile(r'(?:image_id|[iI]mageId)[\'"]?\s*[:=][^;\n]*?([\'"`])([\w-]+)\1')
+IMAGES_BLOCK_PATTERN = re.compile(r'\bimages\??\s*[:=]\s*[\[{]')
+BLOCK_VALUE_PATTERN = re.compile(r'(?:\b(\w+)\s*:\s*)?([\'"`])([\w-]+)\2')
 
 
 def extract_yml_image_count(yml_path: Path) -> int:
@@ -79,39 +126,158 @@ def extract_yml_image_count(yml_path: Path) -> int:
     return len(matches)
 
 
-def get_assets_count(assets_dir: Path) -> int:
+def get_assets_count(page: PageEntry) -> int:
     """獲取 assets 目錄中的圖片數量"""
-    if not assets_dir.exists():
-        return 0
+    return len(page.images)
+
+
+def asset_exists(page: PageEntry, filename: str) -> bool:
+    """檢查 md 引用的檔案是否存在於 assets/（優先查索引，子目錄路徑才 stat）"""
+    if filename in page.assets or filename in page.sidecars:
+        return True
+    if '/' in filename:
+        return (page.assets_dir / filename).exists()
+    return False
+
+
+def extract_sidecar_variants(sidecar: FileEntry) -> list:
+    """從描述檔的 variants 區塊提取檔名（desktop / mobile）"""
+    if sidecar is None:
+        return []
+
+    with open(sidecar.path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    block = VARIANTS_BLOCK_PATTERN.search(content)
+    if not block:
+        return []
+    return VARIANT_VALUE_PATTERN.findall(block.group(1))
+
+
+def extract_sidecar_id(sidecar: FileEntry):
+    """描述檔的 id，沒有描述檔或 id 時為 None"""
+    if sidecar is None:
+        return None
+
+    with open(sidecar.path, 'r', encoding='utf-8') as f:
+        match = SIDECAR_ID_PATTERN.search(f.read())
+    return match.group(1) if match else None
+
+
+def find_orphans(page: PageEntry, md_refs: list) -> list:
+    """
+    找出 assets/ 中未被 md 連結的圖片
+
+    被引用圖片的 variants 也視為已引用；容量直接取自索引的 stat 資料。
+    同時記下描述檔的 id，供 apply_source_refs() 比對前端原始碼。
+    """
+    referenced = {ref['filename'] for ref in md_refs} | page.linked_assets
+    for filename in list(referenced):
+        referenced.update(extract_sidecar_variants(page.sidecar_for(filename)))
+
+    return [
+        {'file': image.name, 'bytes': image.size, 'id': extract_sidecar_id(page.sidecar_for(image.name))}
+        for image in page.images
+        if image.name not in referenced
+    ]
+
+
+def extract_images_blocks(text: str):
+    """取出 images: 之後對應括號內的內容（含巢狀物件 / 陣列）"""
+    for match in IMAGES_BLOCK_PATTERN.finditer(text):
+        depth = 0
+        for end in range(match.end() - 1, len(text)):
+            if text[end] in '[{':
+                depth += 1
+            elif text[end] in ']}':
+                depth -= 1
+                if depth == 0:
+                    break
+        yield text[match.end():end]
+
+
+def extract_source_ids(text: str) -> set:
+    """從單一原始碼檔取出模板以 id 引用的圖片（寫法見 ASSET_CALL_PATTERN 等）"""
+    ids = {m.group(2) for m in ASSET_CALL_PATTERN.finditer(text)}
+    ids.update(m.group(2) for m in IMAGE_ID_KEY_PATTERN.finditer(text))
+    for block in extract_images_blocks(text):
+        ids.update(m.group(3) for m in BLOCK_VALUE_PATTERN.finditer(block) if m.group(1) != 'id')
+    return ids
+
+
+def collect_source_ids(src_dir: Path = SOURCE_DIR):
+    """
+    前端原始碼中引用的所有描述檔 id
+
+    src_dir 不存在時回傳 None。
+    """
+    if not src_dir.is_dir():
+        return None
+
+    ids = set()
+    for root, dirs, files in os.walk(src_dir):
+        for name in files:
+            if name.endswith(SOURCE_EXTENSIONS):
+                with open(os.path.join(root, name), 'r', encoding='utf-8', errors='replace') as f:
+                    ids.update(extract_source_ids(f.read()))
+    return ids
+
+
+def apply_source_refs(result: dict, source_ids: set) -> dict:
+    """
+    移除描述檔 id 出現在前端原始碼中的孤兒檔案
+
+    在快取之後套用（原始碼變更不影響頁面指紋）；回傳新的 dict，不修改傳入的結果。
+    """
+    if not source_ids or not result['orphans']:
+        return result
+
+    orphans = [o for o in result['orphans'] if o.get('id') not in source_ids]
+    if len(orphans) == len(result['orphans']):
+        return result
+    return {**result, 'orphans': orphans, 'orphan_bytes': sum(o['bytes'] for o in orphans)}
+
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
 
-    count = 0
-    for f in assets_dir.iterdir():
-        if f.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']:
-            count += 1
+def parse_size(text: str) -> int:
+    """解析容量字串，例如 500KB、1.5MB、204800"""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?B)?\s*', text.upper())
+    if not match:
+        raise ValueError(f"無法解析的容量: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2) or 'B'])
 
-    return count
 
+def format_bytes(size: int) -> str:
+    """將位元組數轉為易讀格式"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
 
-def audit_page(page_dir: Path, verbose: bool = False) -> dict:
+
+def audit_page(page: PageEntry, verbose: bool = False) -> dict:
     """稽核單一頁面的圖片引用"""
     result = {
-        'page': page_dir.name,
+        'page': page.name,
         'md_refs': 0,
         'yml_refs': 0,
         'assets_count': 0,
         'missing_files': [],
+        'orphans': [],
+        'orphan_bytes': 0,
+        'referenced': [],
+        'ref_bytes': 0,
         'status': 'ok',
         'issues': []
     }
 
-    md_path = page_dir / 'index.md'
-    yml_path = page_dir / 'index.yml'
-    assets_dir = page_dir / 'assets'
-
     # 提取各來源的圖片資訊
-    md_refs = extract_md_image_refs(md_path)
-    yml_count = extract_yml_image_count(yml_path)
-    assets_count = get_assets_count(assets_dir)
+    md_refs = page.md_refs
+    yml_count = extract_yml_image_count(page.yml.path) if page.yml else 0
+    assets_count = get_assets_count(page)
 
     result['md_refs'] = len(md_refs)
     result['yml_refs'] = yml_count
@@ -119,11 +285,21 @@ def audit_page(page_dir: Path, verbose: bool = False) -> dict:
 
     # 檢查 md 引用的圖片是否存在
     for ref in md_refs:
-        file_path = assets_dir / ref['filename']
-        if not file_path.exists():
+        if not asset_exists(page, ref['filename']):
             result['missing_files'].append(ref['filename'])
             result['issues'].append(f"md 引用的圖片不存在: {ref['filename']}")
 
+    # 引用圖片的容量（同一檔案只計一次）
+    for filename in sorted({ref['filename'] for ref in md_refs}):
+        entry = page.assets.get(filename)
+        if entry is not None:
+            result['referenced'].append({'file': filename, 'bytes': entry.size})
+    result['ref_bytes'] = sum(r['bytes'] for r in result['referenced'])
+
+    # 未被引用的 assets（孤兒檔案）
+    result['orphans'] = find_orphans(page, md_refs)
+    result['orphan_bytes'] = sum(o['bytes'] for o in result['orphans'])
+
     # 檢查 md 是否有圖片引用
     if result['md_refs'] == 0 and result['assets_count'] > 0:
         result['issues'].append(f"md 沒有圖片引用，但 assets/ 有 {result['assets_count']} 張圖片")
@@ -144,6 +320,405 @@ def audit_page(page_dir: Path, verbose: bool = False) -> dict:
     return result
 
 
+def apply_budgets(result: dict, image_budget: int = None, page_budget: int = None,
+                  level: str = 'error') -> dict:
+    """
+    檢查引用圖片是否超出容量預算
+
+    回傳新的 dict，不修改傳入的結果（避免預算 issue 被寫入快取）。
+    """
+    if image_budget is None and page_budget is None:
+        return result
+
+    result = {**result, 'issues': list(result['issues']), 'budget_breaches': []}
+
+    if image_budget is not None:
+        for ref in result['referenced']:
+            if ref['bytes'] > image_budget:
+                result['budget_breaches'].append({'file': ref['file'], 'bytes': ref['bytes'],
+                                                  'budget': image_budget})
+                result['issues'].append(
+                    f"圖片超出預算: {ref['file']} ({format_bytes(ref['bytes'])} > {format_bytes(image_budget)})"
+                )
+
+    if page_budget is not None and result['ref_bytes'] > page_budget:
+        result['budget_breaches'].append({'file': None, 'bytes': result['ref_bytes'],
+                                          'budget': page_budget})
+        result['issues'].append(
+            f"頁面引用總容量超出預算: {format_bytes(result['ref_bytes'])} > {format_bytes(page_budget)}"
+        )
+
+    if result['budget_breaches'] and result['status'] != 'error':
+        result['status'] = level
+
+    return result
+
+
+def file_fingerprint(entry: FileEntry, cached: list = None):
+    """
+    計算檔案指紋 [mtime_ns, size, sha1]
+
+    mtime 與 size 皆與快取相同時直接沿用快取的 hash，不讀取檔案內容。
+    """
+    if entry is None:
+        return None
+
+    if cached and cached[0] == entry.mtime_ns and cached[1] == entry.size:
+        return cached
+
+    digest = hashlib.sha1(entry.path.read_bytes()).hexdigest()
+    return [entry.mtime_ns, entry.size, digest]
+
+
+def listing_fingerprint(page: PageEntry):
+    """計算 assets/ 清單的指紋（檔名、size、mtime 皆取自索引，不另外 stat）"""
+    if not page.has_assets_dir:
+        return None
+
+    entries = {**page.assets, **page.sidecars}
+    listing = '\n'.join(
+        f"{name}\t{entries[name].size}\t{entries[name].mtime_ns}" for name in sorted(entries)
+    )
+    return hashlib.sha1(listing.encode('utf-8')).hexdigest()
+
+
+def page_fingerprint(page: PageEntry, cached: dict = None) -> dict:
+    """計算頁面指紋：index.md、index.yml 與 assets/ 清單"""
+    cached = cached or {}
+    return {
+        'md': file_fingerprint(page.md, cached.get('md')),
+        'yml': file_fingerprint(page.yml, cached.get('yml')),
+        'assets': listing_fingerprint(page),
+    }
+
+
+def same_fingerprint(a: dict, b: dict) -> bool:
+    """比對兩個頁面指紋；只比較 size 與 hash，touch 過但內容未變仍視為相同"""
+    for key in ('md', 'yml'):
+        fa, fb = a.get(key), b.get(key)
+        if (fa is None) != (fb is None):
+            return False
+        if fa is not None and fa[1:] != fb[1:]:
+            return False
+    return a.get('assets') == b.get('assets')
+
+
+class AuditCache:
+    """以頁面指紋為 key 的 audit_page() 結果快取"""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = path
+        self.version = f"{CACHE_VERSION}:{'yaml' if HAS_YAML else 'regex'}"
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.version:
+                self.entries = data.get('pages', {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def get(self, page: PageEntry):
+        """回傳快取結果；指紋不符時回傳 None，並記下新指紋待 put() 使用"""
+        key = str(page.path)
+        entry = self.entries.get(key)
+        fingerprint = page_fingerprint(page, entry['fingerprint'] if entry else None)
+
+        if entry and same_fingerprint(entry['fingerprint'], fingerprint):
+            # 更新 mtime，下次可直接以 stat 判斷
+            entry['fingerprint'] = fingerprint
+            self.hits += 1
+            return entry['result']
+
+        self._pending[key] = fingerprint
+        self.misses += 1
+        return None
+
+    def put(self, page: PageEntry, result: dict):
+        key = str(page.path)
+        self.entries[key] = {
+            'fingerprint': self._pending.pop(key),
+            'result': result,
+        }
+
+    def save(self):
+        """寫回快取（temp file + rename，避免中斷時留下損毀的 JSON）"""
+        # 移除已刪除頁面的項目
+        self.entries = {k: v for k, v in self.entries.items() if Path(k).is_dir()}
+
+        write_json_atomic(self.path, {'version': self.version, 'pages': self.entries})
+
+
+def write_json_atomic(path: Path, data: dict):
+    """寫入 JSON（temp file + rename，避免中斷時留下損毀的檔案）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def hash_file(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """以固定大小區塊串流計算 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """檔案內容 hash 快取，以 (size, mtime_ns) 判斷是否需重新計算"""
+
+    def __init__(self, path: Path = HASH_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def digest(self, entry: FileEntry) -> str:
+        key = str(entry.path)
+        cached = self.entries.get(key)
+        if cached and cached[0] == entry.size and cached[1] == entry.mtime_ns:
+            self.hits += 1
+            return cached[2]
+
+        self.misses += 1
+        digest = hash_file(entry.path)
+        self.entries[key] = [entry.size, entry.mtime_ns, digest]
+        return digest
+
+    def save(self):
+        self.entries = {k: v for k, v in self.entries.items() if Path(k).is_file()}
+        write_json_atomic(self.path, self.entries)
+
+
+def find_duplicates(index, hash_cache: HashCache = None) -> list:
+    """
+    找出內容完全相同的 assets
+
+    先以 size 分組，只對同大小的檔案計算 hash 確認。
+
+    Returns:
+        重複群組列表，依浪費容量由大到小排序：
+        [{'hash', 'bytes', 'files': [...], 'wasted_bytes'}]
+    """
+    by_size = {}
+    for page in index:
+        for name in sorted(page.assets):
+            entry = page.assets[name]
+            if entry.size > 0:
+                by_size.setdefault(entry.size, []).append(entry)
+
+    clusters = []
+    for size, entries in by_size.items():
+        if len(entries) < 2:
+            continue
+
+        by_hash = {}
+        for entry in entries:
+            digest = hash_cache.digest(entry) if hash_cache else hash_file(entry.path)
+            by_hash.setdefault(digest, []).append(entry)
+
+        for digest, group in by_hash.items():
+            if len(group) < 2:
+                continue
+            clusters.append({
+                'hash': digest,
+                'bytes': size,
+                'files': [str(entry.path) for entry in group],
+                'wasted_bytes': size * (len(group) - 1),
+            })
+
+    clusters.sort(key=lambda c: (-c['wasted_bytes'], c['files'][0]))
+    return clusters
+
+
+def report_duplicates(index, output_format: str = 'text', use_cache: bool = True):
+    """輸出重複檔案報告"""
+    hash_cache = HashCache() if use_cache else None
+    clusters = find_duplicates(index, hash_cache)
+    if hash_cache is not None:
+        hash_cache.save()
+
+    summary = {
+        'clusters': len(clusters),
+        'duplicate_files': sum(len(c['files']) - 1 for c in clusters),
+        'wasted_bytes': sum(c['wasted_bytes'] for c in clusters),
+    }
+
+    if output_format == 'json':
+        json.dump({'clusters': clusters, 'summary': summary}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    if output_format == 'ndjson':
+        for cluster in clusters:
+            emit_ndjson({'type': 'duplicate', **cluster})
+        emit_ndjson({'type': 'summary', **summary})
+        return
+
+    print("🔍 重複圖片報告")
+    print("=" * 60)
+    print()
+    for cluster in clusters:
+        print(f"🔁 {len(cluster['files'])} 份相同內容（各 {format_bytes(cluster['bytes'])}，"
+              f"浪費 {format_bytes(cluster['wasted_bytes'])}）")
+        for path in cluster['files']:
+            print(f"   - {path}")
+        print()
+
+    print("=" * 60)
+    print("📊 重複結果")
+    print(f"   重複群組: {summary['clusters']}")
+    print(f"   多餘檔案: {summary['duplicate_files']}")
+    print(f"   浪費容量: {format_bytes(summary['wasted_bytes'])}")
+    if hash_cache is not None:
+        print(f"   hash 快取: 命中 {hash_cache.hits} / 重新計算 {hash_cache.misses}")
+
+
+def run_audits(pages: list, verbose: bool = False, jobs: int = 1):
+    """
+    依 pages 順序執行 audit_page()
+
+    jobs > 1 時以 process pool 平行執行，
+    executor.map 會依輸入順序回傳，報告順序與序列模式一致。
+    """
+    audit = partial(audit_page, verbose=verbose)
+
+    if jobs <= 1 or len(pages) <= 1:
+        for page in pages:
+            yield audit(page)
+        return
+
+    workers = min(jobs, len(pages))
+    # 每個 worker 一次領取多頁，減少 IPC 次數
+    chunksize = max(1, len(pages) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(audit, pages, chunksize=chunksize)
+
+
+def iter_audit_results(pages: list, verbose: bool = False, jobs: int = 1,
+                       cache: AuditCache = None):
+    """
+    依 pages 順序逐一產出稽核結果
+
+    有快取時只稽核指紋變更的頁面，其餘直接沿用快取結果。
+    """
+    if cache is None:
+        yield from run_audits(pages, verbose=verbose, jobs=jobs)
+        return
+
+    cached = [cache.get(page) for page in pages]
+    stale = [page for page, result in zip(pages, cached) if result is None]
+    fresh = run_audits(stale, verbose=verbose, jobs=jobs)
+
+    try:
+        for page, result in zip(pages, cached):
+            if result is None:
+                result = next(fresh)
+                cache.put(page, result)
+            yield result
+    finally:
+        fresh.close()
+
+
+def print_result(result: dict, verbose: bool = False, orphans: bool = False,
+                 show_bytes: bool = False):
+    """輸出單一頁面的稽核結果"""
+    if result['status'] == 'ok':
+        icon = '✅'
+    elif result['status'] == 'warning':
+        icon = '⚠️ '
+    else:
+        icon = '❌'
+
+    print(f"{icon} {result['page']}")
+    if show_bytes:
+        print(f"   md: {result['md_refs']} | assets: {result['assets_count']}"
+              f" | 引用容量: {format_bytes(result['ref_bytes'])}")
+    else:
+        print(f"   md: {result['md_refs']} | assets: {result['assets_count']}")
+
+    if verbose or result['status'] != 'ok':
+        for issue in result['issues']:
+            print(f"   └─ {issue}")
+
+    if result['missing_files']:
+        print(f"   └─ 缺失: {', '.join(result['missing_files'])}")
+
+    if orphans and result['orphans']:
+        print(f"   └─ 孤兒檔案 {len(result['orphans'])} 個，可回收 {format_bytes(result['orphan_bytes'])}")
+        for orphan in result['orphans']:
+            print(f"      - {orphan['file']} ({format_bytes(orphan['bytes'])})")
+
+    print()
+
+
+def build_summary(results: list, stats: dict) -> dict:
+    """彙整所有頁面的統計數據"""
+    return {
+        'stats': stats,
+        'total_md_refs': sum(r['md_refs'] for r in results),
+        'total_assets': sum(r['assets_count'] for r in results),
+        'total_orphans': sum(len(r['orphans']) for r in results),
+        'total_orphan_bytes': sum(r['orphan_bytes'] for r in results),
+        'total_missing': sum(len(r['missing_files']) for r in results),
+        'total_ref_bytes': sum(r['ref_bytes'] for r in results),
+        'budget_breaches': sum(len(r.get('budget_breaches', [])) for r in results),
+    }
+
+
+def print_summary(summary: dict, cache: AuditCache = None, verbose: bool = False,
+                  orphans: bool = False, show_bytes: bool = False):
+    """輸出稽核總結"""
+    stats = summary['stats']
+
+    print("=" * 60)
+    print("📊 稽核結果")
+    print(f"   ✅ 正常: {stats['ok']}")
+    print(f"   ⚠️  警告: {stats['warning']}")
+    print(f"   ❌ 錯誤: {stats['error']}")
+    print()
+
+    print(f"   總圖片引用 (md): {summary['total_md_refs']}")
+    print(f"   總圖片檔案 (assets): {summary['total_assets']}")
+    if show_bytes:
+        print(f"   總引用容量: {format_bytes(summary['total_ref_bytes'])}")
+        print(f"   超出預算: {summary['budget_breaches']} 項")
+    if orphans:
+        print(f"   孤兒檔案: {summary['total_orphans']} 個，"
+              f"可回收 {format_bytes(summary['total_orphan_bytes'])}")
+    if cache is not None and verbose:
+        print(f"   快取: 命中 {cache.hits} / 重新稽核 {cache.misses}")
+
+    if summary['total_missing'] > 0:
+        print()
+        print("💡 提示：執行 `git checkout <commit> -- pages/<page>/index.md` 可從歷史恢復")
+    elif stats['warning'] > 0:
+        print()
+        print("💡 提示：建議執行 `npm run sync-content` 同步 md 與 yml")
+
+    if summary['budget_breaches'] > 0:
+        print()
+        print("💡 提示：超出預算的圖片可重新壓縮，或執行 generate_variants.py 產生縮圖")
+
+
+def emit_ndjson(record: dict):
+    """輸出一行 JSON 並立即 flush，讓下游工具可即時處理"""
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
 def main():
     import argparse
 
@@ -155,83 +730,116 @@ def main():
   python3 audit-image-refs.py              # 稽核所有頁面
   python3 audit-image-refs.py --page wms   # 只稽核 wms 頁面
   python3 audit-image-refs.py --verbose    # 顯示詳細資訊
+  python3 audit-image-refs.py --jobs 8     # 以 8 個 process 平行稽核
+  python3 audit-image-refs.py --no-cache   # 忽略快取，全部重新稽核
+  python3 audit-image-refs.py --orphans    # 列出未引用的 assets 與可回收容量
+  python3 audit-image-refs.py --dupes      # 找出跨頁面重複的圖片
+  python3 audit-image-refs.py --image-budget 500KB --page-budget 3MB
+  python3 audit-image-refs.py --format ndjson | jq -c 'select(.status != "ok")'
         """
     )
     parser.add_argument('--page', help='只檢查指定頁面')
     parser.add_argument('--verbose', '-v', action='store_true', help='顯示詳細資訊')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='平行稽核的 worker 數量（0 表示使用全部 CPU）')
+    parser.add_argument('--no-cache', action='store_true', help='不讀寫稽核快取')
+    parser.add_argument('--cache-file', type=Path, default=CACHE_PATH,
+                        help=f'快取檔路徑（預設 {CACHE_PATH}）')
+    parser.add_argument('--format', choices=['text', 'json', 'ndjson'], default='text',
+                        help='輸出格式（預設 text）')
+    parser.add_argument('--orphans', action='store_true',
+                        help='列出未被 index.md 或 astro-app/src 引用的圖片與可回收容量')
+    parser.add_argument('--dupes', action='store_true',
+                        help='找出內容相同的圖片（依 size 分組後以 hash 確認）')
+    parser.add_argument('--image-budget', type=parse_size,
+                        help='單張引用圖片的容量上限（例如 500KB）')
+    parser.add_argument('--page-budget', type=parse_size,
+                        help='單頁引用圖片的總容量上限（例如 3MB）')
+    parser.add_argument('--budget-level', choices=['error', 'warning'], default='error',
+                        help='超出預算時的狀態（預設 error）')
 
     args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    text = args.format == 'text'
+    has_budget = args.image_budget is not None or args.page_budget is not None
+    # 機器可讀模式下，錯誤訊息改輸出至 stderr，避免污染 JSON
+    err = sys.stdout if text else sys.stderr
 
     pages_dir = Path('pages')
     if not pages_dir.exists():
-        print("❌ pages/ 目錄不存在")
+        print("❌ pages/ 目錄不存在", file=err)
         sys.exit(1)
 
-    # 收集要檢查的頁面
+    # 收集要檢查的頁面（單次走訪建立索引）
     if args.page:
-        page_dirs = [pages_dir / args.page]
-        if not page_dirs[0].exists():
-            print(f"❌ 頁面不存在: {args.page}")
+        index = build_index(pages_dir, only=[args.page])
+        if not len(index):
+            print(f"❌ 頁面不存在: {args.page}", file=err)
             sys.exit(1)
     else:
-        page_dirs = sorted([d for d in pages_dir.iterdir() if d.is_dir()])
+        index = build_index(pages_dir)
 
-    print("🔍 圖片引用稽核報告")
-    print("=" * 60)
-    if not HAS_YAML:
-        print("⚠️  PyYAML 未安裝，使用 regex fallback")
-    print()
+    pages = list(index)
+
+    if args.dupes:
+        report_duplicates(index, output_format=args.format, use_cache=not args.no_cache)
+        return
+
+    if text:
+        print("🔍 圖片引用稽核報告")
+        print("=" * 60)
+        if not HAS_YAML:
+            print("⚠️  PyYAML 未安裝，使用 regex fallback")
+        print()
 
     stats = {'ok': 0, 'warning': 0, 'error': 0}
     all_results = []
 
-    for page_dir in page_dirs:
-        result = audit_page(page_dir, verbose=args.verbose)
+    cache = None if args.no_cache else AuditCache(args.cache_file)
+
+    # 孤兒檔案需排除模板以 id 引用的圖片；第一個有孤兒的頁面出現時才走訪原始碼
+    check_source = args.orphans or not text
+    source_ids = None
+
+    for result in iter_audit_results(pages, verbose=args.verbose, jobs=jobs, cache=cache):
+        if check_source and result['orphans']:
+            check_source = False
+            source_ids = collect_source_ids()
+            if args.orphans and source_ids is None:
+                print(f"⚠️  找不到 {SOURCE_DIR}，孤兒檔案未排除模板以 id 引用的圖片，刪除前請先確認", file=err)
+                print(file=err)
+        result = apply_source_refs(result, source_ids)
+        result = apply_budgets(result, args.image_budget, args.page_budget, args.budget_level)
         all_results.append(result)
         stats[result['status']] += 1
+        if args.format == 'ndjson':
+            emit_ndjson({'type': 'page', **result})
+        elif text:
+            print_result(result, verbose=args.verbose, orphans=args.orphans, show_bytes=has_budget)
 
-        # 顯示結果
-        if result['status'] == 'ok':
-            icon = '✅'
-        elif result['status'] == 'warning':
-            icon = '⚠️ '
-        else:
-            icon = '❌'
-
-        print(f"{icon} {result['page']}")
-        print(f"   md: {result['md_refs']} | assets: {result['assets_count']}")
-
-        if args.verbose or result['status'] != 'ok':
-            for issue in result['issues']:
-                print(f"   └─ {issue}")
-
-        if result['missing_files']:
-            print(f"   └─ 缺失: {', '.join(result['missing_files'])}")
-
-        print()
+    if cache is not None:
+        cache.save()
 
     # 總結
-    print("=" * 60)
-    print("📊 稽核結果")
-    print(f"   ✅ 正常: {stats['ok']}")
-    print(f"   ⚠️  警告: {stats['warning']}")
-    print(f"   ❌ 錯誤: {stats['error']}")
-    print()
-
-    total_md_refs = sum(r['md_refs'] for r in all_results)
-    total_assets = sum(r['assets_count'] for r in all_results)
-    print(f"   總圖片引用 (md): {total_md_refs}")
-    print(f"   總圖片檔案 (assets): {total_assets}")
+    summary = build_summary(all_results, stats)
+    if args.format == 'json':
+        json.dump({'pages': all_results, 'summary': summary}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif args.format == 'ndjson':
+        emit_ndjson({'type': 'summary', **summary})
+    else:
+        print_summary(summary, cache=cache, verbose=args.verbose, orphans=args.orphans,
+                      show_bytes=has_budget)
 
     # 如果有錯誤，以非零狀態退出
     if stats['error'] > 0:
-        print()
-        print("💡 提示：執行 `git checkout <commit> -- pages/<page>/index.md` 可從歷史恢復")
         sys.exit(1)
-    elif stats['warning'] > 0:
-        print()
-        print("💡 提示：建議執行 `npm run sync-content` 同步 md 與 yml")
 
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    except BrokenPipeError:
+        # 下游（例如 head）提早關閉管線：stdout 改指向 devnull，避免結束時 flush 再次報錯
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(0)
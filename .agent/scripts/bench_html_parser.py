@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+bench_html_parser.py - analyze_website_design.py 的 HTML 解析方式效能測試
+
+比較 --parser 的三種解析方式在 1 MB ~ 20 MB 頁面上的：
+- 解析時間：parse_page()（解析 + 所有 DOM collector）的耗時
+- 峰值 RSS：每個解析方式、每個頁面各自在獨立的 process 中執行，互不影響
+
+頁面預設為合成的 fixture（首頁結構重複：導覽、卡片、表單、圖片、
+中英文內文），存放於 .cache/design-analyzer-bench/，下次執行直接重用；
+也可指定實際存下的頁面。執行時會確認 stream 的分析結果與 html.parser 完全相同。
+
+使用方式：
+  python3 .agent/scripts/bench_html_parser.py [--sizes 1,5,20] [--repeat 3]
+  python3 .agent/scripts/bench_html_parser.py saved-page.html ...
+"""
+
+import hashlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+FIXTURE_DIR = Path('.cache') / 'design-analyzer-bench'
+DEFAULT_SIZES = [1, 5, 20]
+PAGE_URL = 'https://www.ewill.com.tw/'
+
+WORDS = ['虛擬化', '備份', '雲端', '資安', '解決方案', '企業', 'Proxmox', 'VMware', 'NAS', 'HA', '叢集', '授權']
+
+
+def rss_mb(field: str = 'VmHWM') -> float:
+    """
+    目前 process 的 RSS（MB）：VmHWM 為峰值、VmRSS 為目前值
+
+    Linux 的 ru_maxrss 會沿用 exec 前父 process 的峰值，改讀 /proc/self/status；
+    沒有 /proc 時（macOS）退回 ru_maxrss（單位為 bytes），只能取得峰值。
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def build_block(rng: random.Random, i: int) -> str:
+    """一段區塊：卡片、內文、圖片、按鈕，部分區塊含表單"""
+    text = ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(8, 40)))
+    parts = [
+        f'<section class="section container section-{i % 7}"><div class="row">',
+        f'<div class="col-md-{rng.choice([4, 6, 12])} card"><h2 class="title">{rng.choice(WORDS)} {i}</h2>',
+        f'<p class="text-sm">{text} <a href="/products/{i % 50}.html">了解更多</a>'
+        f' <span class="badge">&amp; {rng.choice(WORDS)}</span></p>',
+        f'<img src="/assets/img-{i % 100}.webp" alt="{rng.choice(WORDS)}" class="img-fluid">',
+        f'<a class="btn btn-primary" href="/contact.html" aria-label="聯絡 {i}">聯絡我們</a>',
+        '<i class="icon fa-arrow-right"></i>',
+    ]
+    if i % 25 == 0:
+        parts.append('<form action="/send" method="post"><label>姓名</label><input type="text">'
+                     '<textarea></textarea><select><option>1</option></select></form>')
+    parts.append('</div></div></section>\n')
+    return ''.join(parts)
+
+
+def build_fixture(size_mb: int, seed: int = 0) -> str:
+    """產生約 size_mb 的完整頁面"""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    head = (
+        '<!DOCTYPE html><html lang="zh-TW"><head><meta charset="utf-8"><title>鎰威科技</title>'
+        '<link rel="stylesheet" href="/css/main.css"><style>.hero{color:#0055AA}</style></head><body>'
+        '<a class="skip-link" href="#main">跳至主要內容</a>'
+        '<header class="site-header"><nav class="main-nav">'
+        + ''.join(f'<a href="/{name}.html">{name}</a>' for name in ('products', 'solutions', 'about', 'contact'))
+        + '</nav></header><nav class="breadcrumb"><a href="/">首頁</a> / 產品</nav><main id="main">\n'
+    )
+    tail = '</main><footer class="site-footer"><a href="/privacy.html">隱私權政策</a></footer></body></html>\n'
+    parts = [head]
+    size = len(head.encode('utf-8')) + len(tail.encode('utf-8'))
+    i = 0
+    while size < target:
+        block = build_block(rng, i)
+        parts.append(block)
+        size += len(block.encode('utf-8'))
+        i += 1
+    parts.append(tail)
+    return ''.join(parts)
+
+
+def fixture_paths(sizes: list) -> list:
+    """取得（必要時產生）各大小的 fixture 頁面"""
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for size_mb in sizes:
+        path = FIXTURE_DIR / f'page-{size_mb}mb.html'
+        if not path.exists():
+            print(f"📝 產生 fixture: {path}")
+            tmp_path = path.with_name(path.name + '.tmp')
+            tmp_path.write_text(build_fixture(size_mb), encoding='utf-8')
+            os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def measure(parser: str, path: str):
+    """（子 process）解析一次並以 JSON 輸出耗時、峰值 RSS 與結果摘要"""
+    import analyze_website_design as analyzer
+
+    # 先載入解析用的套件，解析時間不含 import
+    analyzer.load_dependencies(['bs4', 'lxml.etree'] if parser == 'lxml' else ['bs4'])
+
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    # 解析前：模組與頁面文字已載入
+    before = rss_mb('VmRSS')
+
+    start = time.perf_counter()
+    page, soup = analyzer.parse_page(html, PAGE_URL, parser)
+    elapsed = time.perf_counter() - start
+    peak = rss_mb('VmHWM')
+
+    digest = hashlib.sha256(json.dumps(page, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+    print(json.dumps({'seconds': elapsed, 'peak_mb': peak, 'before_mb': before, 'digest': digest}))
+
+
+def run_measure(parser: str, path: Path) -> dict:
+    # 固定 hash seed：結果中由 set 轉成的清單順序才能跨 process 比較
+    env = dict(os.environ, PYTHONHASHSEED='0')
+    output = subprocess.run(
+        [sys.executable, __file__, '--measure', parser, str(path)],
+        check=True, stdout=subprocess.PIPE, text=True, env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='HTML 解析方式效能測試（解析時間、峰值 RSS）')
+    parser.add_argument('pages', nargs='*', type=Path, help='要測試的 HTML 檔（預設使用合成 fixture）')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help=f"fixture 大小（MB），逗號分隔（預設 {','.join(map(str, DEFAULT_SIZES))}）")
+    parser.add_argument('--repeat', type=int, default=3, help='重複次數，取最佳值（預設 3）')
+    parser.add_argument('--measure', nargs=2, metavar=('PARSER', 'FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    import analyze_website_design as analyzer
+
+    backends = [name for name in analyzer.PARSER_BACKENDS if name != 'lxml' or analyzer.HAS_LXML]
+    if not analyzer.HAS_LXML:
+        print("⚠️  未安裝 lxml，略過 lxml")
+
+    paths = args.pages or fixture_paths(sorted({int(s) for s in args.sizes.split(',') if s.strip()}))
+    mismatched = False
+
+    print(f"⏱️  {len(paths)} 個頁面 × {len(backends)} 種解析方式，取 {args.repeat} 次最佳值")
+    print("=" * 60)
+
+    for path in paths:
+        print(f"\n📄 {path}（{path.stat().st_size / (1024 * 1024):.1f} MB）")
+        results = {}
+        for backend in backends:
+            runs = [run_measure(backend, path) for _ in range(args.repeat)]
+            best = min(runs, key=lambda run: run['seconds'])
+            best['peak_mb'] = min(run['peak_mb'] for run in runs)
+            results[backend] = best
+
+        baseline = results['html.parser']
+        for backend, result in results.items():
+            speedup = baseline['seconds'] / result['seconds']
+            print(f"   {result['seconds']:7.2f} s  ×{speedup:<4.1f}  峰值 RSS {result['peak_mb']:7.1f} MB"
+                  f"（解析前 {result['before_mb']:.1f} MB）  {backend}")
+
+            if result['digest'] != baseline['digest']:
+                if backend == 'stream':
+                    print("   ❌ stream 的分析結果與 html.parser 不同")
+                    mismatched = True
+                else:
+                    print(f"   ⚠️  {backend} 的分析結果與 html.parser 不同（標籤不成對時會自動補正）")
+
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+bench_id_normalizer.py - fix-yml-metadata.py 的 id / alt 生成效能測試
+
+以合成的檔名語料（預設 100,000 筆）比較：
+- 舊版：每次呼叫都經過 re 模組查找 pattern、串接 .lower().replace()
+- 新版：預先編譯的 pattern、ASCII 單次 translate、LRU 快取
+
+語料模擬實際 pages/ 的分布：大量重複的設計稿檔名（Frame-81_fix0219 等）、
+帶日期的上傳檔名、中文檔名與大小寫混合的副檔名。
+執行前會先確認兩個版本對每筆輸入的結果完全相同。
+
+使用方式：
+  python3 .agent/scripts/bench_id_normalizer.py [--count 100000] [--repeat 5]
+"""
+
+import random
+import re
+import sys
+import time
+
+from script_loader import load_script
+
+COMMON_STEMS = [
+    'Frame-81_fix0219', 'Frame-82_fix0219', 'Group 1171', 'bn-home',
+    'bn-proxmox-1209-scaled', 'icon-arrow', 'logo', 'img_0001',
+]
+CJK_STEMS = ['首頁橫幅', '產品圖', '架構圖 v2', '客戶案例-01']
+EXTENSIONS = ['.png', '.jpg', '.JPG', '.webp', '.gif', '.jpeg']
+
+
+def legacy_generate_id(filename: str) -> str:
+    """舊版實作（比較基準）"""
+    name = filename
+    if name.endswith('.yml'):
+        name = name[:-4]
+    name = re.sub(r'\.(jpg|png|webp|gif)$', '', name, flags=re.IGNORECASE)
+    name = name.lower().replace('-', '_').replace(' ', '_')
+    name = re.sub(r'[^a-z0-9_]', '', name)
+    name = re.sub(r'_+', '_', name).strip('_')
+    return name if name else 'img'
+
+
+def legacy_generate_alt(description: str, filename: str) -> str:
+    """舊版實作的檔名分支（比較基準）"""
+    name = filename
+    if name.endswith('.yml'):
+        name = name[:-4]
+    return re.sub(r'\.(jpg|png|webp|gif)$', '', name, flags=re.IGNORECASE)
+
+
+def build_corpus(count: int, seed: int = 0) -> list:
+    """產生合成檔名；約七成為重複的常見檔名"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.7:
+            stem = rng.choice(COMMON_STEMS)
+        elif roll < 0.8:
+            stem = f"{rng.choice(CJK_STEMS)}_{rng.randrange(100)}"
+        else:
+            stem = f"upload-{2020 + i % 6}{rng.randrange(1, 13):02d}-{rng.randrange(10 ** 6)}"
+        corpus.append(f"{stem}{rng.choice(EXTENSIONS)}.yml")
+    return corpus
+
+
+def time_per_file(func, corpus: list, repeat: int) -> float:
+    """回傳每筆檔名的最佳耗時（ns）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for filename in corpus:
+            func(filename)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(corpus)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='id / alt 生成效能測試')
+    parser.add_argument('--count', type=int, default=100_000, help='合成檔名數量（預設 100000）')
+    parser.add_argument('--repeat', type=int, default=5, help='重複次數，取最佳值（預設 5）')
+    args = parser.parse_args()
+
+    fix_yml = load_script('fix-yml-metadata.py')
+    corpus = build_corpus(args.count)
+
+    # 先確認結果一致
+    for filename in corpus:
+        if fix_yml.generate_id_from_filename(filename) != legacy_generate_id(filename):
+            print(f"❌ id 結果不一致: {filename}")
+            sys.exit(1)
+        if fix_yml.generate_alt_from_description('', filename) != legacy_generate_alt('', filename):
+            print(f"❌ alt 結果不一致: {filename}")
+            sys.exit(1)
+
+    print(f"⏱️  {len(corpus):,} 筆檔名（{len(set(corpus)):,} 個不重複），取 {args.repeat} 次最佳值")
+    print("=" * 60)
+
+    generate_id = fix_yml.generate_id_from_filename
+    rows = [
+        ('id  舊版', time_per_file(legacy_generate_id, corpus, args.repeat)),
+        ('id  新版（無快取）', time_per_file(generate_id.__wrapped__, corpus, args.repeat)),
+        ('id  新版（LRU 快取）', time_per_file(generate_id, corpus, args.repeat)),
+        ('alt 舊版', time_per_file(lambda f: legacy_generate_alt('', f), corpus, args.repeat)),
+        ('alt 新版', time_per_file(lambda f: fix_yml.generate_alt_from_description('', f),
+                                  corpus, args.repeat)),
+    ]
+
+    baseline = {'id': rows[0][1], 'alt': rows[3][1]}
+    for label, ns in rows:
+        speedup = baseline[label.split()[0]] / ns
+        print(f"   {ns:8.0f} ns/檔案  ×{speedup:<4.1f} {label}")
+
+    info = generate_id.cache_info()
+    print(f"   快取命中率: {info.hits / max(1, info.hits + info.misses):.1%}")
+
+
+if __name__ == '__main__':
+    main()
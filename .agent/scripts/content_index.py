@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+content_index.py - pages/ 內容索引（稽核腳本共用）
+
+用途：
+- 以單次 os.scandir 走訪 pages/，建立頁面、assets、.yml 描述檔的記憶體索引
+- 供 audit-image-refs.py、find_undescribed.py、fix-yml-metadata.py 共用，
+  多個檢查串連執行時只需走訪一次檔案系統
+
+結構：
+    pages/<page>/index.md        → PageEntry.md
+    pages/<page>/index.yml       → PageEntry.yml
+    pages/<page>/assets/<file>   → PageEntry.assets
+    pages/<page>/assets/<f>.yml  → PageEntry.sidecars
+
+使用方式：
+    from content_index import build_index
+
+    index = build_index(Path('pages'))
+    for page in index:
+        print(page.name, len(page.images))
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg')
+
+MD_IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(assets/([^)]+)\)')
+# 所有本機圖片連結：assets/x、./assets/x、./images/x（後兩者為舊版匯入的寫法，檔案同樣位於 assets/）
+MD_LOCAL_IMAGE_PATTERN = re.compile(r'!\[[^\]]*\]\((?:\./)?(?:assets|images)/([^)]+)\)')
+
+
+@dataclass
+class FileEntry:
+    """單一檔案的路徑與 stat 資訊（取自 scandir，不另外 stat）"""
+    name: str
+    path: Path
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry, parent: Path) -> 'FileEntry':
+        st = entry.stat()
+        return cls(entry.name, parent / entry.name, st.st_size, st.st_mtime_ns)
+
+    @property
+    def is_image(self) -> bool:
+        return self.name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+@dataclass
+class PageEntry:
+    """單一頁面目錄"""
+    name: str
+    path: Path
+    md: FileEntry = None
+    yml: FileEntry = None
+    has_assets_dir: bool = False
+    # 檔名 → FileEntry（不含 .yml 描述檔）
+    assets: dict = field(default_factory=dict)
+    # 描述檔檔名（例如 logo.png.yml）→ FileEntry
+    sidecars: dict = field(default_factory=dict)
+
+    @property
+    def assets_dir(self) -> Path:
+        return self.path / 'assets'
+
+    @property
+    def images(self) -> list:
+        """assets/ 中的圖片檔（依檔名排序）"""
+        return [self.assets[name] for name in sorted(self.assets) if self.assets[name].is_image]
+
+    @cached_property
+    def md_content(self) -> str:
+        """index.md 的內容（首次存取時才讀取檔案；沒有 index.md 時為空字串）"""
+        if self.md is None:
+            return ''
+
+        with open(self.md.path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @cached_property
+    def md_refs(self) -> list:
+        """index.md 中的 ![](assets/...) 圖片引用"""
+        return [{'alt': alt, 'filename': filename}
+                for alt, filename in MD_IMAGE_PATTERN.findall(self.md_content)]
+
+    @cached_property
+    def linked_assets(self) -> set:
+        """index.md 以任何本機路徑（assets/、./assets/、./images/）連結的檔名"""
+        return set(MD_LOCAL_IMAGE_PATTERN.findall(self.md_content))
+
+    def sidecar_for(self, asset_name: str):
+        """回傳圖片對應的描述檔 FileEntry，不存在時為 None"""
+        return self.sidecars.get(asset_name + '.yml')
+
+
+@dataclass
+class ContentIndex:
+    """pages/ 的記憶體索引"""
+    pages_dir: Path
+    # 頁面名稱 → PageEntry（依名稱排序插入）
+    pages: dict = field(default_factory=dict)
+
+    def __iter__(self):
+        return iter(self.pages.values())
+
+    def __len__(self):
+        return len(self.pages)
+
+    def get(self, name: str):
+        return self.pages.get(name)
+
+    def iter_sidecars(self):
+        """依頁面、檔名順序產出所有描述檔"""
+        for page in self:
+            for name in sorted(page.sidecars):
+                yield page.sidecars[name]
+
+    def iter_images(self):
+        """依頁面、檔名順序產出 (page, image) 配對"""
+        for page in self:
+            for image in page.images:
+                yield page, image
+
+    def iter_image_sidecars(self):
+        """產出 (page, image, sidecar)；僅限 <圖片檔名>.yml 形式的描述檔"""
+        for page, image in self.iter_images():
+            sidecar = page.sidecar_for(image.name)
+            if sidecar is not None:
+                yield page, image, sidecar
+
+
+def _scan_assets(page: PageEntry):
+    with os.scandir(page.assets_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            file_entry = FileEntry.from_dir_entry(entry, page.assets_dir)
+            if entry.name.endswith('.yml'):
+                page.sidecars[entry.name] = file_entry
+            else:
+                page.assets[entry.name] = file_entry
+
+
+def scan_page(page_dir: Path) -> PageEntry:
+    """走訪單一頁面目錄"""
+    page = PageEntry(name=page_dir.name, path=page_dir)
+
+    with os.scandir(page_dir) as it:
+        for entry in it:
+            if entry.name == 'index.md' and entry.is_file():
+                page.md = FileEntry.from_dir_entry(entry, page_dir)
+            elif entry.name == 'index.yml' and entry.is_file():
+                page.yml = FileEntry.from_dir_entry(entry, page_dir)
+            elif entry.name == 'assets' and entry.is_dir():
+                page.has_assets_dir = True
+
+    if page.has_assets_dir:
+        _scan_assets(page)
+
+    return page
+
+
+def build_index(pages_dir: Path, only: list = None) -> ContentIndex:
+    """
+    以單次走訪建立 pages/ 索引
+
+    Args:
+        pages_dir: pages/ 目錄
+        only: 只索引指定名稱的頁面（None 表示全部）
+
+    Returns:
+        ContentIndex，頁面依名稱排序
+    """
+    index = ContentIndex(pages_dir=pages_dir)
+    wanted = set(only) if only else None
+
+    with os.scandir(pages_dir) as it:
+        names = sorted(entry.name for entry in it
+                       if entry.is_dir() and (wanted is None or entry.name in wanted))
+
+    for name in names:
+        index.pages[name] = scan_page(pages_dir / name)
+
+    return index
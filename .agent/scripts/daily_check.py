@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+daily_check.py - 每日內容檢查（共用單一 pages/ 索引）
+
+依序執行：
+1. 圖片引用稽核（audit-image-refs.py）
+2. 缺少描述檔的圖片（find_undescribed.py）
+3. 描述檔缺少 id / alt（fix-yml-metadata.py，僅檢查不寫回）
+
+三項檢查共用 content_index.build_index() 建立的索引，
+整個流程只走訪一次 pages/。
+
+使用方式：
+  python3 .agent/scripts/daily_check.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from content_index import build_index
+from script_loader import load_script
+
+
+def main():
+    pages_dir = Path('pages')
+    if not pages_dir.exists():
+        print("❌ pages/ 目錄不存在")
+        sys.exit(1)
+
+    audit = load_script('audit-image-refs.py')
+    undescribed_mod = load_script('find_undescribed.py')
+    fix_yml = load_script('fix-yml-metadata.py')
+
+    start = time.perf_counter()
+    index = build_index(pages_dir)
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    print("🩺 每日內容檢查")
+    print("=" * 60)
+    print(f"📂 索引 {len(index)} 個頁面（{scan_ms:.1f} ms）")
+    print()
+
+    # 1. 圖片引用稽核
+    stats = {'ok': 0, 'warning': 0, 'error': 0}
+    cache = audit.AuditCache()
+    for result in audit.iter_audit_results(list(index), cache=cache):
+        stats[result['status']] += 1
+        if result['status'] == 'error':
+            print(f"❌ {result['page']}: {', '.join(result['issues'])}")
+    cache.save()
+    print(f"1. 圖片引用稽核: ✅ {stats['ok']} | ⚠️  {stats['warning']} | ❌ {stats['error']}")
+
+    # 2. 缺少描述檔
+    undescribed = undescribed_mod.find_undescribed_in_index(index)
+    for path in undescribed:
+        print(f"   - {path}")
+    print(f"2. 缺少描述檔: {len(undescribed)} 張")
+
+    # 3. 描述檔欄位
+    incomplete = [
+        sidecar.path for sidecar in index.iter_sidecars()
+        if fix_yml.fix_yml_file(str(sidecar.path), write=False)['updated']
+    ]
+    print(f"3. 缺少 id/alt 的描述檔: {len(incomplete)} 個")
+    if incomplete:
+        print("   💡 執行 `python3 .agent/scripts/fix-yml-metadata.py` 可自動補齊")
+
+    print("=" * 60)
+
+    sys.exit(1 if stats['error'] or undescribed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,12 @@ find_undescribed.py - 找出缺少 .yml 描述檔的圖片
     python scripts/find_undescribed.py              # 掃描整個專案
     python scripts/find_undescribed.py pages/       # 掃描所有頁面
     python scripts/find_undescribed.py pages/logsec # 掃描指定頁面
+    python scripts/find_undescribed.py --changed    # 只檢查 git 中變更的圖片
+    python scripts/find_undescribed.py --staged     # 只檢查已暫存的圖片（pre-commit）
+
+掃描 pages/ 或單一頁面時改用 content_index 的共用索引（僅檢查 assets/），
+其餘目錄以 os.scandir 走訪，並略過 node_modules、dist 等建置輸出。
+報告最後會列出掃描的目錄數、檔案數與耗時。
 
 相關 SOP：
     - .agent/sop/02b_image_metadata.md
@@ -14,39 +20,134 @@ find_undescribed.py - 找出缺少 .yml 描述檔的圖片
 
 import os
 import sys
+import time
 from pathlib import Path
 
+from content_index import ContentIndex, build_index
+from git_changes import ChangedFiles, GitError, changed_files
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+# 不需檢查的目錄：工具 / 文件目錄、依賴套件、建置輸出與網站靜態檔（favicon 等）
+DEFAULT_SKIP_DIRS = {
+    '.git', '.agent', '.claude', 'scripts', 'design', 'design_reference', 'variants',
+    'node_modules', 'dist', '.astro', '.vercel', '.cache', '.output', 'coverage', 'public',
+}
 
-def find_undescribed_images(root_dir: Path, skip_dirs: set = None) -> list:
+
+def find_undescribed_images(root_dir: Path, skip_dirs: set = None, stats: dict = None) -> list:
     """
     找出指定目錄下缺少 .yml 描述檔的圖片
     
+    以 os.scandir 走訪，每個目錄的檔名建成 set 後再查詢描述檔，
+    並在進入子目錄前就排除 skip_dirs（node_modules、dist 等建置輸出）。
+    
     Args:
         root_dir: 要掃描的根目錄
         skip_dirs: 要跳過的目錄名稱集合
+        stats: 若提供，填入 dirs / files / elapsed_ms 統計
     
     Returns:
         缺少描述檔的圖片路徑列表
     """
-    skip_dirs = skip_dirs or {'.git', '.agent', '.claude', 'scripts', 'design', 'design_reference'}
+    skip_dirs = skip_dirs or DEFAULT_SKIP_DIRS
     undescribed = []
+    dir_count = 0
+    file_count = 0
+    start = time.perf_counter()
     
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # 跳過指定目錄
-        dirnames[:] = [d for d in dirnames if d not in skip_dirs]
+    stack = [str(root_dir)]
+    while stack:
+        dirpath = stack.pop()
+        dir_count += 1
+        filenames = set()
+        images = []
         
-        # 找出圖片檔案
-        images = [f for f in filenames if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))]
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs:
+                            stack.append(entry.path)
+                        continue
+                    filenames.add(entry.name)
+                    if entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        images.append(entry.name)
+        except (PermissionError, FileNotFoundError):
+            continue
         
+        file_count += len(filenames)
         for img in images:
-            yml = img + ".yml"
-            if yml not in filenames:
+            if img + ".yml" not in filenames:
                 undescribed.append(Path(dirpath) / img)
     
+    if stats is not None:
+        stats.update({
+            'dirs': dir_count,
+            'files': file_count,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+        })
+    
+    return sorted(undescribed)
+
+
+def find_undescribed_in_index(index: ContentIndex) -> list:
+    """
+    從共用索引找出缺少 .yml 描述檔的圖片（不另外走訪檔案系統）
+
+    Args:
+        index: content_index.build_index() 建立的索引
+
+    Returns:
+        缺少描述檔的圖片路徑列表
+    """
+    undescribed = [
+        image.path
+        for page, image in index.iter_images()
+        if image.name.lower().endswith(IMAGE_EXTENSIONS) and page.sidecar_for(image.name) is None
+    ]
     return sorted(undescribed)
 
 
-def print_report(undescribed: list, root_dir: Path):
+def find_undescribed_in_changes(changes: ChangedFiles, skip_dirs: set = None) -> list:
+    """
+    只檢查 git 中變更的圖片，以及描述檔被修改 / 刪除的圖片
+
+    Args:
+        changes: git_changes.changed_files() 的結果
+        skip_dirs: 要跳過的目錄名稱集合
+
+    Returns:
+        缺少描述檔的圖片路徑列表
+    """
+    skip_dirs = skip_dirs or DEFAULT_SKIP_DIRS
+    candidates = {p for p in changes.modified if p.name.lower().endswith(IMAGE_EXTENSIONS)}
+
+    # 描述檔有變動時，一併檢查對應的圖片
+    for path in changes.modified | changes.deleted:
+        if path.name.endswith('.yml'):
+            image = path.with_name(path.name[:-4])
+            if image.name.lower().endswith(IMAGE_EXTENSIONS) and image.exists():
+                candidates.add(image)
+
+    undescribed = [
+        image for image in candidates
+        if not skip_dirs.intersection(image.relative_to(changes.root).parts[:-1])
+        and not image.with_name(image.name + '.yml').exists()
+    ]
+    return sorted(undescribed)
+
+
+def index_for(root_dir: Path):
+    """root_dir 為 pages/ 或其下單一頁面時建立索引，否則回傳 None"""
+    if root_dir.name == 'pages':
+        return build_index(root_dir)
+    if root_dir.parent.name == 'pages':
+        return build_index(root_dir.parent, only=[root_dir.name])
+    return None
+
+
+def print_report(undescribed: list, root_dir: Path, stats: dict = None):
     """輸出檢查報告"""
     print("=" * 60)
     print("圖片描述檔檢查報告")
@@ -74,23 +175,64 @@ def print_report(undescribed: list, root_dir: Path):
     else:
         print("\n✅ 所有圖片都有對應的描述檔！")
     
+    if stats:
+        print("-" * 60)
+        print(f"⏱️  掃描 {stats['dirs']} 個目錄、{stats['files']} 個檔案，"
+              f"耗時 {stats['elapsed_ms']:.1f} ms（{stats['mode']}）")
+    
     print("=" * 60)
 
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='找出缺少 .yml 描述檔的圖片')
+    parser.add_argument('root', nargs='?', help='掃描目錄（預設為專案根目錄）')
+    parser.add_argument('--changed', action='store_true',
+                        help='只檢查 git 工作區 / 暫存區中變更的圖片')
+    parser.add_argument('--staged', action='store_true',
+                        help='只檢查已暫存的變更（隱含 --changed）')
+    args = parser.parse_args()
+    
     # 決定掃描目錄
-    if len(sys.argv) > 1:
-        root_dir = Path(sys.argv[1]).resolve()
+    if args.root:
+        root_dir = Path(args.root).resolve()
     else:
-        # 預設為腳本所在目錄的上層（專案根目錄）
-        root_dir = Path(__file__).parent.parent.resolve()
+        # 預設為專案根目錄（.agent/scripts/ 的上兩層）
+        root_dir = Path(__file__).resolve().parent.parent.parent
     
     if not root_dir.exists():
         print(f"錯誤: 目錄不存在 - {root_dir}")
         sys.exit(1)
     
-    undescribed = find_undescribed_images(root_dir)
-    print_report(undescribed, root_dir)
+    stats = {}
+    start = time.perf_counter()
+    index = None if args.changed or args.staged else index_for(root_dir)
+    if args.changed or args.staged:
+        try:
+            changes = changed_files(root_dir, staged_only=args.staged).under(root_dir)
+        except GitError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        undescribed = find_undescribed_in_changes(changes)
+        stats = {
+            'dirs': len({p.parent for p in changes.modified | changes.deleted}),
+            'files': len(changes.modified) + len(changes.deleted),
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+            'mode': 'git changes',
+        }
+    elif index is not None:
+        undescribed = find_undescribed_in_index(index)
+        stats = {
+            'dirs': len(index) + sum(page.has_assets_dir for page in index),
+            'files': sum(len(page.assets) + len(page.sidecars) for page in index),
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+            'mode': 'content index',
+        }
+    else:
+        undescribed = find_undescribed_images(root_dir, stats=stats)
+        stats['mode'] = 'scandir'
+    print_report(undescribed, root_dir, stats)
     
     # 返回狀態碼（用於 CI/CD）
     sys.exit(0 if not undescribed else 1)
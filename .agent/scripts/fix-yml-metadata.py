@@ -1,26 +1,78 @@
 #!/usr/bin/env python3
 """
 批次補齊 .yml 檔案的 id 和 alt 欄位（無外部依賴版本）
+
+選項：
+  --dimensions  只讀取圖片檔頭，將 width / height / format / bytes 寫入描述檔；
+                描述檔記錄的 bytes 與圖片大小相同時略過，不重新讀取圖片
+  --changed     只處理 git 工作區 / 暫存區中變更的圖片與描述檔
+  --staged      同 --changed，但只看已暫存的變更（pre-commit 用）
+  --dry-run     只輸出 unified diff，不寫回任何檔案
+  --jobs N      以 N 個 worker process 平行處理描述檔（預設 1）；
+                結果依檔案順序彙整，輸出與序列模式相同
+  --dedupe-ids  將既有的重複 id 改為 <id>_2、<id>_3…（預設只回報）
+
+id 唯一性：
+  每次執行以所有頁面描述檔的既有 id 建立一次全域索引（IdRegistry），
+  新產生的 id 若已被使用（例如全中文檔名都會產生 img），
+  依路徑順序加上 _2、_3… 後綴，結果可重現。
+
+寫回方式：
+  所有變更先在記憶體中計算完成，再以「暫存檔 + rename」整批寫回；
+  中斷時原始檔案不會被截斷。
 """
 
+import difflib
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+from content_index import ContentIndex, FileEntry, build_index
+from git_changes import GitError, changed_files
+from image_header import read_image_info
+from sidecar_yaml import set_fields
+
+# 預先編譯，避免每個描述檔重新查找 / 編譯 pattern
+IMAGE_SUFFIX_PATTERN = re.compile(r'\.(jpg|png|webp|gif)$', re.IGNORECASE)
+NON_ID_CHAR_PATTERN = re.compile(r'[^a-z0-9_]')
+UNDERSCORE_RUN_PATTERN = re.compile(r'__+')
+YAML_KEY_VALUE_PATTERN = re.compile(r'^(\w+):\s*(.*)$')
+
+# ASCII 檔名的單次轉換表：大寫轉小寫、空格與連字號轉底線、其餘符號刪除
+ASCII_ID_TABLE = str.maketrans(
+    {chr(c): None for c in range(128) if not chr(c).isalnum() and chr(c) != '_'}
+    | {c: c.lower() for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'}
+    | {'-': '_', ' ': '_'}
+)
+
+def strip_image_suffix(filename: str) -> str:
+    """移除 .yml 與圖片副檔名（.jpg, .png 等）"""
+    name = filename[:-4] if filename.endswith('.yml') else filename
+    return IMAGE_SUFFIX_PATTERN.sub('', name)
+
+@lru_cache(maxsize=4096)
 def generate_id_from_filename(filename: str) -> str:
-    """從檔名生成 id"""
-    # 移除 .yml 副檔名
-    name = filename
-    if name.endswith('.yml'):
-        name = name[:-4]
-    # 移除 .jpg, .png 等
-    name = re.sub(r'\.(jpg|png|webp|gif)$', '', name, flags=re.IGNORECASE)
-    # 轉為小寫，空格和連字號轉底線
-    name = name.lower().replace('-', '_').replace(' ', '_')
-    # 移除非 ASCII 字元，保留字母數字底線
-    name = re.sub(r'[^a-z0-9_]', '', name)
+    """
+    從檔名生成 id
+    
+    同一批頁面常有大量相同檔名（例如 Frame-81_fix0219.png.yml），
+    以 LRU 快取避免重複計算。
+    """
+    name = strip_image_suffix(filename)
+    if name.isascii():
+        # 常見情況：單次 translate 完成轉小寫、轉底線與移除符號
+        name = name.translate(ASCII_ID_TABLE)
+    else:
+        # 轉為小寫，空格和連字號轉底線，移除非 ASCII 字元
+        name = name.lower().replace('-', '_').replace(' ', '_')
+        name = NON_ID_CHAR_PATTERN.sub('', name)
     # 移除連續底線
-    name = re.sub(r'_+', '_', name).strip('_')
+    if '__' in name:
+        name = UNDERSCORE_RUN_PATTERN.sub('_', name)
+    name = name.strip('_')
     return name if name else 'img'
 
 def parse_simple_yaml(content: str) -> dict:
@@ -34,7 +86,7 @@ def parse_simple_yaml(content: str) -> dict:
             continue
         
         # 檢查是否是 key: value 格式
-        match = re.match(r'^(\w+):\s*(.*)$', line)
+        match = YAML_KEY_VALUE_PATTERN.match(line)
         if match:
             key = match.group(1)
             value = match.group(2).strip()
@@ -58,19 +110,146 @@ def generate_alt_from_description(description: str, filename: str) -> str:
                 alt = alt.rsplit('，', 1)[0]
         return alt
     # 如果沒有 description，從檔名生成
-    name = filename
-    if name.endswith('.yml'):
-        name = name[:-4]
-    name = re.sub(r'\.(jpg|png|webp|gif)$', '', name, flags=re.IGNORECASE)
-    return name
-
-def fix_yml_file(yml_path: str) -> dict:
-    """修復單個 .yml 檔案"""
+    return strip_image_suffix(filename)
+
+class IdRegistry:
+    """
+    全域 id 索引（id → 描述檔路徑），每次執行只建立一次
+    
+    以 dict 查詢，每個描述檔的衝突檢查為 O(1)。衝突時依序改用
+    <id>_2、<id>_3…；同一個 id 記住下一個候選編號，不需每次從 _2 重試。
+    依排序後的路徑順序登記，結果可重現。
+    """
+    
+    def __init__(self):
+        self.owners = {}
+        # (id, 重複的描述檔, 先登記的描述檔)
+        self.duplicates = []
+        self._next_suffix = {}
+    
+    def register(self, id_: str, path: str) -> bool:
+        """登記既有 id；已被其他描述檔使用時記錄為重複並回傳 False"""
+        owner = self.owners.setdefault(id_, path)
+        if owner != path:
+            self.duplicates.append((id_, path, owner))
+            return False
+        return True
+    
+    def claim(self, base: str, path: str) -> str:
+        """為描述檔取得不衝突的 id（base 可用時直接使用）"""
+        if self.owners.setdefault(base, path) == path:
+            return base
+        
+        n = self._next_suffix.get(base, 2)
+        while f"{base}_{n}" in self.owners:
+            n += 1
+        self._next_suffix[base] = n + 1
+        
+        candidate = f"{base}_{n}"
+        self.owners[candidate] = path
+        return candidate
+
+def build_id_registry(index: ContentIndex) -> IdRegistry:
+    """讀取所有描述檔的既有 id 建立 IdRegistry（依頁面、檔名順序）"""
+    registry = IdRegistry()
+    for sidecar in index.iter_sidecars():
+        with open(sidecar.path, 'r', encoding='utf-8') as f:
+            id_ = parse_simple_yaml(f.read()).get('id')
+        if id_:
+            registry.register(id_, str(sidecar.path))
+    return registry
+
+def remove_tmp_files(tmp_paths):
+    """清除暫存檔（已不存在的略過）"""
+    for tmp_path in tmp_paths:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+def write_atomic(path: str, content: str):
+    """寫入暫存檔後 rename，中斷時不會留下截斷的檔案或殘留的暫存檔"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_tmp_files([tmp_path])
+        raise
+
+def fsync_dir(directory: str):
+    """同步目錄項目，確保 rename 寫入磁碟（不支援開啟目錄的平台略過）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def commit_rewrites(rewrites: dict):
+    """
+    批次寫回：先寫入並 fsync 所有暫存檔，再逐一 rename，最後 fsync 所在目錄
+    
+    暫存檔寫入失敗時清除所有暫存檔（包含寫到一半的），原始檔案維持不變。
+    rename 階段並非全有或全無：某個 rename 失敗（權限、跨裝置、Ctrl-C）時，
+    已 rename 的檔案保留新內容，其餘暫存檔清除、原始檔案不變。
+    """
+    tmp_paths = {}
+    try:
+        for path, content in rewrites.items():
+            tmp_path = f"{path}.tmp"
+            # 先登記再寫入：寫到一半失敗的暫存檔也會被清除
+            tmp_paths[path] = tmp_path
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        remove_tmp_files(tmp_paths.values())
+        raise
+    
+    items = list(tmp_paths.items())
+    renamed = 0
+    try:
+        for path, tmp_path in items:
+            os.replace(tmp_path, path)
+            renamed += 1
+    except BaseException:
+        # 只清除尚未 rename 的暫存檔
+        remove_tmp_files(tmp_path for _, tmp_path in items[renamed:])
+        raise
+    finally:
+        for directory in sorted({os.path.dirname(os.path.abspath(path)) for path in tmp_paths}):
+            fsync_dir(directory)
+
+def print_diff(path: str, original: str, updated: str):
+    """輸出 unified diff"""
+    diff = difflib.unified_diff(
+        original.splitlines(keepends=True), updated.splitlines(keepends=True),
+        fromfile=f"a/{path}", tofile=f"b/{path}",
+    )
+    sys.stdout.writelines(diff)
+
+def fix_yml_file(yml_path: str, write: bool = True, content: str = None) -> dict:
+    """
+    修復單個 .yml 檔案
+    
+    原始與新內容分別放在 result['original'] / result['content']；
+    write=False 時只計算、不寫回。
+    content 可傳入尚未寫回的內容（批次模式下前一步驟的結果）。
+    """
     result = {'path': yml_path, 'updated': False, 'changes': []}
     
     try:
-        with open(yml_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if content is None:
+            with open(yml_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        result['original'] = content
         
         # 解析 YAML
         data = parse_simple_yaml(content)
@@ -78,73 +257,214 @@ def fix_yml_file(yml_path: str) -> dict:
         # 取得原始檔名
         filename = os.path.basename(yml_path)
         
-        needs_update = False
+        # 缺少的欄位 → 補上的值
+        fields = {}
         
         # 檢查並補齊 id
         if 'id' not in data or not data['id']:
-            data['id'] = generate_id_from_filename(filename)
-            result['changes'].append(f"新增 id: {data['id']}")
-            needs_update = True
+            fields['id'] = generate_id_from_filename(filename)
+            result['changes'].append(f"新增 id: {fields['id']}")
+            result['generated_id'] = fields['id']
         
         # 檢查並補齊 alt
         if 'alt' not in data or not data['alt']:
-            data['alt'] = generate_alt_from_description(
+            fields['alt'] = generate_alt_from_description(
                 data.get('description', ''), 
                 filename
             )
-            result['changes'].append(f"新增 alt: {data['alt'][:30]}...")
-            needs_update = True
+            result['changes'].append(f"新增 alt: {fields['alt'][:30]}...")
         
-        if needs_update:
-            # 重新生成 YAML 內容
-            lines = []
-            
-            # 按順序輸出欄位
-            for key in ['id', 'alt', 'description', 'variants']:
-                if key in data and data[key]:
-                    value = data[key]
-                    # 如果值包含特殊字元，用引號包裹
-                    if isinstance(value, str) and ('"' in value or ':' in value or '\n' in value):
-                        value = f"'{value}'"
-                    elif isinstance(value, str) and any(c in value for c in ['，', '。', '、']):
-                        value = f"'{value}'"
-                    lines.append(f"{key}: {value}")
+        if fields:
+            # 只替換或附加 id / alt，其餘欄位（renditions、variants、
+            # 多行 description、爬蟲的巢狀欄位）原樣保留
+            result['content'] = set_fields(content, fields)
             
             # 寫回檔案
-            with open(yml_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(lines) + '\n')
+            if write:
+                write_atomic(yml_path, result['content'])
+            
+        result['updated'] = bool(fields)
             
-            result['updated'] = True
+    except Exception as e:
+        result['error'] = str(e)
+    
+    return result
+
+def update_image_meta(yml_path: str, image: FileEntry, write: bool = True,
+                      content: str = None) -> dict:
+    """將圖片尺寸、格式與大小寫入描述檔（參數與回傳同 fix_yml_file）"""
+    result = {'path': yml_path, 'updated': False, 'changes': []}
+    
+    try:
+        if content is None:
+            with open(yml_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        result['original'] = content
+        
+        data = parse_simple_yaml(content)
+        
+        # 已記錄且大小未變：略過，不讀取圖片
+        if data.get('bytes') == str(image.size) and data.get('width') and data.get('height'):
+            return result
+        
+        info = read_image_info(image.path)
+        if info is None:
+            return result
+        
+        result['changes'].append(
+            f"圖片資訊: {info['format']} {info['width']}x{info['height']} ({info['bytes']} bytes)"
+        )
+        result['updated'] = True
+        result['content'] = set_fields(content, info)
+        
+        if write:
+            write_atomic(yml_path, result['content'])
             
     except Exception as e:
         result['error'] = str(e)
     
     return result
 
+def process_sidecar(task: tuple) -> tuple:
+    """
+    處理單一描述檔（可在 worker process 執行，只計算不寫回）
+    
+    Args:
+        task: (描述檔路徑, 圖片 FileEntry；不需寫入圖片資訊時為 None)
+    
+    Returns:
+        (fix_yml_file 結果, update_image_meta 結果或 None)
+    """
+    yml_path, image = task
+    fix = fix_yml_file(yml_path, write=False)
+    meta = None
+    if image is not None:
+        meta = update_image_meta(yml_path, image, write=False, content=fix.get('content'))
+    return fix, meta
+
+def run_sidecars(tasks: list, jobs: int = 1):
+    """
+    依 tasks 順序執行 process_sidecar()
+    
+    jobs > 1 時以 process pool 平行執行，
+    executor.map 會依輸入順序回傳，輸出與序列模式一致。
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield process_sidecar(task)
+        return
+    
+    workers = min(jobs, len(tasks))
+    # 每個 worker 一次領取多個描述檔，減少 IPC 次數
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(process_sidecar, tasks, chunksize=chunksize)
+
 def main():
-    pages_dir = Path('pages')
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='批次補齊 .yml 檔案的 id 和 alt 欄位')
+    parser.add_argument('--dimensions', action='store_true',
+                        help='讀取圖片檔頭，將 width/height/format/bytes 寫入描述檔')
+    parser.add_argument('--changed', action='store_true',
+                        help='只處理 git 中變更的圖片與描述檔')
+    parser.add_argument('--staged', action='store_true',
+                        help='只處理已暫存的變更（隱含 --changed）')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='只輸出 unified diff，不寫回檔案')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='以 N 個 worker process 平行處理（預設 1；0 表示使用全部 CPU）')
+    parser.add_argument('--dedupe-ids', action='store_true',
+                        help='將既有的重複 id 改為 <id>_2、<id>_3…（預設只回報）')
+    args = parser.parse_args()
     
+    pages_dir = Path('pages')
     if not pages_dir.exists():
         print("❌ pages/ 目錄不存在")
         return
     
-    # 找出所有 .yml 檔案（在 assets/ 目錄下）
-    yml_files = list(pages_dir.glob('*/assets/*.yml'))
+    changed = None
+    if args.changed or args.staged:
+        try:
+            changes = changed_files(staged_only=args.staged).under(pages_dir)
+        except GitError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        changed = changes.modified
+        # 只索引有變更的頁面
+        pages_root = pages_dir.resolve()
+        touched = {p.relative_to(pages_root).parts[0] for p in changed}
+        index = build_index(pages_dir, only=touched) if touched else ContentIndex(pages_dir)
+        # id 必須全域唯一：衝突檢查仍涵蓋所有頁面
+        full_index = build_index(pages_dir)
+    else:
+        index = full_index = build_index(pages_dir)
+    
+    def is_changed(*entries) -> bool:
+        return changed is None or any(e.path.resolve() in changed for e in entries)
+    
+    # 找出所有 .yml 檔案（在 assets/ 目錄下）；--changed 時包含變更圖片的描述檔
+    changed_images = {
+        sidecar.path for page, image, sidecar in index.iter_image_sidecars() if is_changed(image)
+    } if changed is not None else set()
+    yml_files = [sidecar.path for sidecar in index.iter_sidecars()
+                 if is_changed(sidecar) or sidecar.path in changed_images]
     
     print(f"🔍 找到 {len(yml_files)} 個 .yml 檔案")
     print("=" * 60)
     
+    # 每個描述檔一個工作；--dimensions 的對象必定包含在 yml_files 中
+    meta_images = {
+        sidecar.path: image for page, image, sidecar in index.iter_image_sidecars()
+        if is_changed(image, sidecar)
+    } if args.dimensions else {}
+    tasks = [(str(path), meta_images.get(path)) for path in yml_files]
+    
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    results = list(run_sidecars(tasks, jobs=jobs))
+    
+    # 先登記所有既有 id，再依檔案順序為新產生的 id 消除衝突
+    registry = build_id_registry(full_index)
+    # 描述檔路徑 → 消除衝突後的 id
+    resolved_ids = {}
+    collision_count = 0
+    for result, _ in results:
+        base = result.get('generated_id')
+        if base is None:
+            continue
+        resolved = registry.claim(base, result['path'])
+        if resolved != base:
+            resolved_ids[result['path']] = resolved
+            collision_count += 1
+            result['changes'] = [
+                f"新增 id: {resolved}（{base} 已被使用）" if change == f"新增 id: {base}" else change
+                for change in result['changes']
+            ]
+    
+    duplicates = registry.duplicates
+    if changed is not None:
+        duplicates = [d for d in duplicates if Path(d[1]).resolve() in changed]
+    if args.dedupe_ids:
+        for id_, path, _ in duplicates:
+            resolved_ids[path] = registry.claim(id_, path)
+    
     updated_count = 0
     error_count = 0
     skipped_count = 0
     
-    for yml_path in yml_files:
-        result = fix_yml_file(str(yml_path))
-        
+    # 路徑 → (原始內容, 新內容)；全部計算完才寫回
+    rewrites = {}
+    
+    def stage(result: dict):
+        entry = rewrites.setdefault(result['path'], [result['original'], None])
+        entry[1] = result['content']
+    
+    for yml_path, (result, _) in zip(yml_files, results):
         if result.get('error'):
             print(f"❌ {yml_path}: {result['error']}")
             error_count += 1
         elif result['updated']:
+            stage(result)
             print(f"✅ {yml_path}")
             for change in result['changes']:
                 print(f"   - {change}")
@@ -152,11 +472,61 @@ def main():
         else:
             skipped_count += 1
     
+    if args.dimensions:
+        meta_count = 0
+        for yml_path, (_, result) in zip(yml_files, results):
+            if result is None:
+                continue
+            if result.get('error'):
+                print(f"❌ {yml_path}: {result['error']}")
+                error_count += 1
+            elif result['updated']:
+                stage(result)
+                print(f"📐 {yml_path}")
+                for change in result['changes']:
+                    print(f"   - {change}")
+                meta_count += 1
+    
+    for id_, path, owner in duplicates:
+        if args.dedupe_ids:
+            print(f"🔁 {path}")
+            print(f"   - 重複 id: {id_}（與 {owner} 相同），改為 {resolved_ids[path]}")
+        else:
+            print(f"⚠️  {path}: 重複 id {id_}（與 {owner} 相同）")
+    
+    # id 衝突的處理套用在最終內容上（--dimensions 的結果也包含 id 行）
+    for path, id_ in resolved_ids.items():
+        if path not in rewrites:
+            with open(path, 'r', encoding='utf-8') as f:
+                original = f.read()
+            rewrites[path] = [original, original]
+        rewrites[path][1] = set_fields(rewrites[path][1], {'id': id_})
+    
     print("=" * 60)
-    print(f"📊 結果：")
+    
+    if args.dry_run:
+        for path, (original, updated) in rewrites.items():
+            print_diff(path, original, updated)
+        print("=" * 60)
+    elif rewrites:
+        commit_rewrites({path: updated for path, (_, updated) in rewrites.items()})
+    
+    print(f"📊 結果：{'（dry-run，未寫回）' if args.dry_run else ''}")
     print(f"   更新: {updated_count} 個檔案")
     print(f"   跳過: {skipped_count} 個檔案（已完整）")
+    if args.dimensions:
+        print(f"   圖片資訊: {meta_count} 個檔案")
+    print(f"   id 衝突: {collision_count} 個（已加上 _2、_3… 後綴）")
+    if duplicates:
+        action = '已改名' if args.dedupe_ids else '使用 --dedupe-ids 修正'
+        print(f"   重複 id: {len(duplicates)} 個（{action}）")
     print(f"   錯誤: {error_count} 個檔案")
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    except BrokenPipeError:
+        # --dry-run 的 diff 被下游（例如 head）提早關閉管線：
+        # stdout 改指向 devnull，避免結束時 flush 再次報錯
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(0)
@@ -1,33 +1,43 @@
 import sys
 import re
 
+# Regex to find lines like: key: 'string with 'another' quote'
+# It captures the key and the single-quoted value
+pattern = re.compile(r"^(\s*\w+:\s*)'(.*'.*)'$")
+
+# A fixable line has at least three single quotes (two outer, one inner)
+MIN_QUOTES = 3
+
+def fix_lines(lines, file_path):
+    """Yield fixed lines, printing each replacement"""
+    for line in lines:
+        match = pattern.match(line.strip())
+        if match:
+            key_part = match.group(1)
+            value_part = match.group(2)
+            # Replace outer quotes with double quotes
+            new_line = f'{key_part}"{value_part}"\n'
+            print(f"FIXED: {file_path}\n  - {line.strip()}\n  + {new_line.strip()}")
+            yield new_line
+        else:
+            yield line
+
 def fix_yaml_file(file_path):
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        new_lines = []
-        changed = False
-        # Regex to find lines like: key: 'string with 'another' quote'
-        # It captures the key and the single-quoted value
-        pattern = re.compile(r"^(\s*\w+:\s*)'(.*'.*)'$")
-
-        for line in lines:
-            match = pattern.match(line.strip())
-            if match:
-                key_part = match.group(1)
-                value_part = match.group(2)
-                # Replace outer quotes with double quotes
-                new_line = f'{key_part}"{value_part}"\n'
-                new_lines.append(new_line)
-                changed = True
-                print(f"FIXED: {file_path}\n  - {line.strip()}\n  + {new_line.strip()}")
-            else:
-                new_lines.append(line)
-
-        if changed:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+        with open(file_path, 'rb') as f:
+            data = f.read()
+
+        # Quick byte-level check: most files never need decoding
+        if data.count(b"'") < MIN_QUOTES:
+            return False
+
+        text = data.decode('utf-8')
+        new_text = ''.join(fix_lines(text.splitlines(keepends=True), file_path))
+
+        # Only rewrite files whose content actually changes
+        if new_text != text:
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(new_text)
             return True
         return False
 
@@ -35,15 +45,56 @@ def fix_yaml_file(file_path):
         print(f"Error processing file {file_path}: {e}", file=sys.stderr)
         return False
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python fix_yaml_quotes.py <file1.yml> <file2.yml> ...", file=sys.stderr)
+def read_paths(stream, separator=b'\n', chunk_size=65536):
+    """Yield paths from a binary stream as they arrive, without buffering all input"""
+    pending = b''
+    while True:
+        # read1 returns whatever is available instead of waiting for a full chunk
+        chunk = stream.read1(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        *paths, pending = pending.split(separator)
+        for path in paths:
+            if path.strip():
+                yield path.rstrip(b'\r').decode('utf-8')
+    if pending.strip():
+        yield pending.rstrip(b'\r').decode('utf-8')
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Replace outer single quotes with double quotes in YAML values that contain single quotes",
+        epilog="Examples:\n"
+               "  python fix_yaml_quotes.py a.yml b.yml\n"
+               "  git ls-files -z '*.yml' | python fix_yaml_quotes.py --stdin -0\n"
+               "  find pages -name '*.yml' | python fix_yaml_quotes.py --stdin",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('files', nargs='*', help='YAML files to fix')
+    parser.add_argument('--stdin', action='store_true',
+                        help='read file paths from stdin (newline-separated) instead of argv')
+    parser.add_argument('-0', '--null', action='store_true',
+                        help='with --stdin, paths are NUL-separated (find -print0, git ls-files -z)')
+    args = parser.parse_args()
+
+    if args.stdin:
+        files_to_fix = read_paths(sys.stdin.buffer, b'\0' if args.null else b'\n')
+    elif args.files:
+        files_to_fix = args.files
+    else:
+        parser.print_usage(sys.stderr)
         sys.exit(1)
 
-    files_to_fix = sys.argv[1:]
+    processed_count = 0
     fixed_count = 0
     for file_path in files_to_fix:
+        processed_count += 1
         if fix_yaml_file(file_path):
             fixed_count += 1
-    
-    print(f"\nProcessed {len(files_to_fix)} files. Fixed {fixed_count} files.")
+
+    print(f"\nProcessed {processed_count} files. Fixed {fixed_count} files.")
+
+if __name__ == "__main__":
+    main()
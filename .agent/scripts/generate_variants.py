@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+generate_variants.py - 產生 assets 的響應式縮圖（WebP / AVIF）
+
+用途：
+- 走訪 pages/*/assets/ 中有描述檔的圖片，依設定寬度輸出縮小版本
+- 輸出至 pages/<page>/assets/variants/<來源檔名>-<width>w.<format>
+  （保留來源副檔名，foo.jpg 與 foo.png 的版本不會互相覆蓋）
+- 輸出檔比來源新時略過，不重新編碼
+- 已從設定移除的寬度 / 格式（或來源縮小後不再需要）的舊版本會刪除
+- 將實際產生的版本清單寫回描述檔的 renditions 欄位：
+
+    renditions:
+      - file: variants/bn-proxmox-1209-scaled.jpg-640w.webp
+        width: 640
+        height: 356
+        format: webp
+        bytes: 21834
+
+說明：
+- 只縮小不放大：寬度大於等於原圖的設定值會略過
+- 依 EXIF orientation 轉正後再縮圖，記錄的寬高為轉正後的尺寸
+- 僅處理 JPEG / PNG / WebP 來源（GIF 動畫與 SVG 不處理）
+- 描述檔既有的 variants（desktop / mobile）為版面用途，不受影響
+- 需要 Pillow；AVIF 需 Pillow 11.3 以上（或 pillow-avif-plugin），
+  不支援時自動略過 AVIF
+
+使用方式：
+  python3 .agent/scripts/generate_variants.py [--page PAGE] [--widths 640,1024,1600]
+                                              [--formats webp,avif] [--jobs N]
+"""
+
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from content_index import build_index
+from sidecar_yaml import set_fields
+
+# 嘗試載入 Pillow，若無則無法產生縮圖
+try:
+    from PIL import Image, ImageOps, features
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+DEFAULT_WIDTHS = [640, 1024, 1600]
+DEFAULT_FORMATS = ['webp', 'avif']
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+VARIANTS_DIR = 'variants'
+
+# EXIF orientation 標籤；5–8 表示需旋轉 90°，轉正後寬高互換
+EXIF_ORIENTATION = 0x0112
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+ENCODER_OPTIONS = {
+    'webp': {'quality': 80, 'method': 6},
+    'avif': {'quality': 60},
+}
+
+
+def supported_formats(formats: list) -> list:
+    """過濾掉目前 Pillow 不支援編碼的格式"""
+    return [fmt for fmt in formats if fmt in features.modules and features.check_module(fmt)]
+
+
+def parse_widths(text: str) -> list:
+    """解析逗號分隔的寬度，例如 640,1024,1600"""
+    widths = set()
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        if not part.strip().isdigit() or int(part) <= 0:
+            raise ValueError(f"無法解析的寬度: {part}")
+        widths.add(int(part))
+    if not widths:
+        raise ValueError(f"未指定寬度: {text}")
+    return sorted(widths)
+
+
+def variant_name(source_name: str, width: int, fmt: str) -> str:
+    """輸出檔名保留來源副檔名（foo.jpg → foo.jpg-640w.webp）"""
+    return f"{source_name}-{width}w.{fmt}"
+
+
+def remove_stale_variants(source: Path, keep: set, keep_formats: list = ()) -> int:
+    """
+    刪除 variants/ 中此來源不再需要的版本，回傳刪除數量
+
+    keep 為本次的輸出檔名；keep_formats 中的格式（要求了但目前 Pillow
+    不支援編碼）不刪除，換到不支援 AVIF 的環境執行時不會清掉既有檔案。
+    舊版只以主檔名命名的版本（foo-640w.webp）一併刪除。
+    """
+    out_dir = source.parent / VARIANTS_DIR
+    stem = source.name.rsplit('.', 1)[0]
+    pattern = re.compile(rf'(?:{re.escape(source.name)}|{re.escape(stem)})-\d+w\.(\w+)')
+    removed = 0
+    try:
+        with os.scandir(out_dir) as it:
+            for entry in it:
+                match = pattern.fullmatch(entry.name)
+                if match and entry.name not in keep and match.group(1) not in keep_formats:
+                    os.remove(entry.path)
+                    removed += 1
+    except FileNotFoundError:
+        pass
+    return removed
+
+
+def is_fresh(output: Path, source_mtime_ns: int) -> bool:
+    """輸出檔存在且比來源新"""
+    try:
+        return output.stat().st_mtime_ns >= source_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def generate_for_image(task: tuple, widths: list, formats: list, keep_formats: list = ()) -> dict:
+    """
+    產生單張圖片的所有縮圖，並刪除不再需要的舊版本（於 worker process 執行）
+
+    Args:
+        task: (來源路徑, 來源 mtime_ns)
+        keep_formats: 不刪除的格式（見 remove_stale_variants）
+
+    Returns:
+        {'source', 'renditions', 'generated', 'skipped', 'removed', 'error'}
+    """
+    source_path, source_mtime_ns = task
+    source = Path(source_path)
+    out_dir = source.parent / VARIANTS_DIR
+    result = {'source': source_path, 'renditions': [], 'generated': 0, 'skipped': 0, 'removed': 0}
+
+    try:
+        with Image.open(source) as im:
+            src_width, src_height = im.size
+            # 只讀 EXIF 判斷方向（不解碼像素）；手機直拍的 JPEG 轉正後寬高互換
+            if im.getexif().get(EXIF_ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+                src_width, src_height = src_height, src_width
+            targets = [w for w in widths if w < src_width]
+
+            loaded = None
+            for width in targets:
+                height = max(1, round(src_height * width / src_width))
+                for fmt in formats:
+                    output = out_dir / variant_name(source.name, width, fmt)
+
+                    if is_fresh(output, source_mtime_ns):
+                        result['skipped'] += 1
+                    else:
+                        if loaded is None:
+                            # 延遲解碼：全部略過時不需要載入像素
+                            has_alpha = im.mode in ('RGBA', 'LA') or 'transparency' in im.info
+                            loaded = ImageOps.exif_transpose(im).convert('RGBA' if has_alpha else 'RGB')
+                        out_dir.mkdir(exist_ok=True)
+                        resized = loaded.resize((width, height), Image.LANCZOS)
+                        tmp_path = output.with_name(output.name + '.tmp')
+                        resized.save(tmp_path, format=fmt.upper(), **ENCODER_OPTIONS.get(fmt, {}))
+                        os.replace(tmp_path, output)
+                        result['generated'] += 1
+
+                    result['renditions'].append({
+                        'file': f"{VARIANTS_DIR}/{output.name}",
+                        'width': width,
+                        'height': height,
+                        'format': fmt,
+                        'bytes': output.stat().st_size,
+                    })
+
+        keep = {Path(rendition['file']).name for rendition in result['renditions']}
+        result['removed'] = remove_stale_variants(source, keep, keep_formats)
+    except Exception as e:
+        result['error'] = str(e)
+
+    return result
+
+
+def write_renditions(sidecar_path: Path, renditions: list) -> bool:
+    """將縮圖清單寫回描述檔；內容未變時不寫入"""
+    with open(sidecar_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    # 沒有任何縮圖且描述檔本來就沒有 renditions：不新增空欄位
+    if not renditions and not re.search(r'^renditions:', content, re.MULTILINE):
+        return False
+
+    updated = set_fields(content, {'renditions': renditions})
+    if updated == content:
+        return False
+
+    # 暫存檔 + rename，中斷時不會留下截斷的描述檔
+    tmp_path = sidecar_path.with_name(sidecar_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    os.replace(tmp_path, sidecar_path)
+    return True
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='產生 assets 的響應式縮圖（WebP / AVIF）',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例：
+  python3 generate_variants.py                        # 處理所有頁面
+  python3 generate_variants.py --page proxmox_ve      # 只處理指定頁面
+  python3 generate_variants.py --widths 480,960 -j 8  # 自訂寬度，8 個 process
+        """
+    )
+    parser.add_argument('--page', help='只處理指定頁面')
+    parser.add_argument('--widths', type=parse_widths, default=DEFAULT_WIDTHS,
+                        help=f"輸出寬度，逗號分隔（預設 {','.join(map(str, DEFAULT_WIDTHS))}）")
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS),
+                        help=f"輸出格式，逗號分隔（預設 {','.join(DEFAULT_FORMATS)}）")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='以 N 個 worker process 平行處理（預設 1；0 表示使用全部 CPU）')
+    args = parser.parse_args()
+
+    if not HAS_PIL:
+        print("❌ 需要 Pillow：pip install Pillow")
+        sys.exit(1)
+
+    widths = args.widths
+    requested = [f.strip().lower() for f in args.formats.split(',') if f.strip()]
+    formats = supported_formats(requested)
+    for fmt in requested:
+        if fmt not in formats:
+            print(f"⚠️  目前的 Pillow 不支援 {fmt.upper()}，略過")
+    if not formats:
+        sys.exit(1)
+
+    pages_dir = Path('pages')
+    if not pages_dir.exists():
+        print("❌ pages/ 目錄不存在")
+        sys.exit(1)
+
+    index = build_index(pages_dir, only=[args.page] if args.page else None)
+    if args.page and not len(index):
+        print(f"❌ 頁面不存在: {args.page}")
+        sys.exit(1)
+
+    # 依頁面、檔名排序，確保輸出順序固定
+    pairs = [(image, sidecar) for page, image, sidecar in index.iter_image_sidecars()
+             if image.name.lower().endswith(SOURCE_EXTENSIONS)]
+    tasks = [(str(image.path), image.mtime_ns) for image, _ in pairs]
+
+    print(f"🖼️  {len(tasks)} 張圖片 × 寬度 {widths} × 格式 {formats}")
+    print("=" * 60)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    unsupported = [fmt for fmt in requested if fmt not in formats]
+    worker = partial(generate_for_image, widths=widths, formats=formats, keep_formats=unsupported)
+
+    stats = {'generated': 0, 'skipped': 0, 'removed': 0, 'sidecars': 0, 'errors': 0}
+
+    if jobs <= 1:
+        results = map(worker, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(worker, tasks)
+
+    try:
+        for (image, sidecar), result in zip(pairs, results):
+            if result.get('error'):
+                print(f"❌ {image.path}: {result['error']}")
+                stats['errors'] += 1
+                continue
+
+            stats['generated'] += result['generated']
+            stats['skipped'] += result['skipped']
+            stats['removed'] += result['removed']
+
+            if write_renditions(sidecar.path, result['renditions']):
+                stats['sidecars'] += 1
+
+            if result['generated'] or result['removed']:
+                print(f"✅ {image.path}（新增 {result['generated']} 個、刪除 {result['removed']} 個版本）")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print("=" * 60)
+    print("📊 結果：")
+    print(f"   產生: {stats['generated']} 個檔案")
+    print(f"   略過: {stats['skipped']} 個檔案（已是最新）")
+    print(f"   刪除: {stats['removed']} 個檔案（已不在設定中）")
+    print(f"   更新描述檔: {stats['sidecars']} 個")
+    print(f"   錯誤: {stats['errors']} 張圖片")
+
+    if stats['errors']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+git_changes.py - 取得 git 工作區 / 暫存區中變更的檔案
+
+供 find_undescribed.py、fix-yml-metadata.py 的 --changed 模式使用，
+讓 pre-commit 只處理變更的圖片與描述檔，而非整個 pages/。
+
+來源（皆為本機 git 指令，不需網路）：
+- git diff --cached --name-only      已暫存的變更
+- git diff --name-only               未暫存的變更（staged_only=False 時）
+- git ls-files --others              未追蹤的新檔案（staged_only=False 時）
+
+使用方式：
+    from git_changes import changed_files
+
+    changes = changed_files()
+    changes.modified   # 新增 / 修改 / 更名後的路徑（絕對路徑）
+    changes.deleted    # 已刪除的路徑
+
+不在 git 工作目錄中或未安裝 git 時拋出 GitError。
+"""
+
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+class GitError(RuntimeError):
+    """無法取得 git 變更（不在 git 工作目錄中、未安裝 git 等）"""
+
+
+@dataclass
+class ChangedFiles:
+    root: Path
+    modified: set = field(default_factory=set)
+    deleted: set = field(default_factory=set)
+
+    def under(self, directory: Path) -> 'ChangedFiles':
+        """只保留 directory 底下的路徑"""
+        directory = directory.resolve()
+        return ChangedFiles(
+            root=self.root,
+            modified={p for p in self.modified if directory in p.parents},
+            deleted={p for p in self.deleted if directory in p.parents},
+        )
+
+
+def _git(args: list, cwd: Path) -> list:
+    """執行 git 指令並以 NUL 分隔解析輸出（中文檔名不會被跳脫）"""
+    output = subprocess.run(
+        ['git', *args, '-z'], cwd=cwd, check=True,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    ).stdout.decode('utf-8')
+    return [item for item in output.split('\0') if item]
+
+
+def _parse_name_status(items: list, root: Path, changes: ChangedFiles):
+    # --name-status -z 輸出：狀態, 路徑[, 新路徑（R/C）]
+    i = 0
+    while i < len(items):
+        status = items[i]
+        if status[0] in 'RC':
+            old_path, new_path = items[i + 1], items[i + 2]
+            if status[0] == 'R':
+                changes.deleted.add(root / old_path)
+            changes.modified.add(root / new_path)
+            i += 3
+        else:
+            path = root / items[i + 1]
+            if status[0] == 'D':
+                changes.deleted.add(path)
+            else:
+                changes.modified.add(path)
+            i += 2
+
+
+def changed_files(cwd: Path = None, staged_only: bool = False) -> ChangedFiles:
+    """
+    取得變更的檔案
+
+    Args:
+        cwd: git 工作目錄（預設為目前目錄）
+        staged_only: 只取已暫存（git add）的變更，供 pre-commit 使用
+
+    Returns:
+        ChangedFiles，路徑皆為絕對路徑
+
+    Raises:
+        GitError: git 指令不存在或執行失敗
+    """
+    cwd = cwd or Path.cwd()
+    try:
+        return _collect_changes(cwd, staged_only)
+    except FileNotFoundError as e:
+        raise GitError("找不到 git 指令，--changed / --staged 需要安裝 git") from e
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode('utf-8', 'replace') if isinstance(e.stderr, bytes) else e.stderr or ''
+        detail = stderr.strip().splitlines()[0] if stderr.strip() else f"結束碼 {e.returncode}"
+        raise GitError(f"無法取得 {cwd} 的 git 變更：{detail}") from e
+
+
+def _collect_changes(cwd: Path, staged_only: bool) -> ChangedFiles:
+    root = Path(subprocess.run(
+        ['git', 'rev-parse', '--show-toplevel'], cwd=cwd, check=True,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    ).stdout.strip())
+
+    changes = ChangedFiles(root=root)
+    _parse_name_status(_git(['diff', '--cached', '--name-status', '-M'], root), root, changes)
+
+    if not staged_only:
+        _parse_name_status(_git(['diff', '--name-status', '-M'], root), root, changes)
+        for path in _git(['ls-files', '--others', '--exclude-standard'], root):
+            changes.modified.add(root / path)
+
+    # 暫存後又在工作區刪除 / 恢復的檔案，以目前檔案系統為準
+    for path in list(changes.modified):
+        if not path.exists():
+            changes.modified.discard(path)
+            changes.deleted.add(path)
+    changes.deleted -= changes.modified
+
+    return changes
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+image_header.py - 只讀取檔頭取得圖片尺寸與格式（無外部依賴）
+
+支援格式：PNG、JPEG、WebP（VP8 / VP8L / VP8X）、GIF
+JPEG 以 seek 略過各 segment 內容，只讀取 marker 與 SOF 欄位，
+不需解碼或載入整張圖片。
+
+使用方式：
+    python3 .agent/scripts/image_header.py pages/wms/assets/*.png
+"""
+
+import os
+import struct
+import sys
+from pathlib import Path
+
+# JPEG SOF markers（排除 DHT 0xC4、JPG 0xC8、DAC 0xCC）
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# 沒有長度欄位的 JPEG markers
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+
+def _png_size(f, head: bytes):
+    # 8 bytes signature + IHDR length/type，寬高位於 16..24
+    if len(head) < 24 or head[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', head[16:24])
+
+
+def _gif_size(f, head: bytes):
+    if len(head) < 10:
+        return None
+    return struct.unpack('<HH', head[6:10])
+
+
+def _webp_size(f, head: bytes):
+    if len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ':
+        # keyframe 起始碼 9d 01 2a 之後為 14-bit 寬高
+        if head[23:26] != b'\x9d\x01\x2a':
+            return None
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        if head[20] != 0x2F:
+            return None
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        width = int.from_bytes(head[24:27], 'little') + 1
+        height = int.from_bytes(head[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+def _jpeg_size(f, head: bytes):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        # 略過填充的 0xFF
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker == 0xD9:  # EOI
+            return None
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+
+        f.seek(length - 2, os.SEEK_CUR)
+
+        # 進入 marker 前應為 0xFF
+        if f.read(1) != b'\xff':
+            return None
+
+
+def _detect_format(head: bytes):
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png', _png_size
+    if head.startswith(b'\xff\xd8'):
+        return 'jpeg', _jpeg_size
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp', _webp_size
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif', _gif_size
+    return None, None
+
+
+def read_image_info(path: Path) -> dict:
+    """
+    只讀取檔頭取得圖片資訊
+
+    Returns:
+        {'width', 'height', 'format', 'bytes'}；無法辨識的格式回傳 None
+    """
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        fmt, reader = _detect_format(head)
+        if fmt is None:
+            return None
+
+        size = reader(f, head)
+        if not size:
+            return None
+
+        return {
+            'width': size[0],
+            'height': size[1],
+            'format': fmt,
+            'bytes': os.fstat(f.fileno()).st_size,
+        }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 image_header.py <image> [<image> ...]", file=sys.stderr)
+        sys.exit(1)
+
+    for arg in sys.argv[1:]:
+        info = read_image_info(Path(arg))
+        if info is None:
+            print(f"❌ {arg}: 無法辨識的圖片格式")
+        else:
+            print(f"{arg}: {info['format']} {info['width']}x{info['height']} ({info['bytes']} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+script_loader.py - 載入檔名含連字號的腳本
+
+audit-image-refs.py、fix-yml-metadata.py 等檔名含連字號，無法直接 import；
+供 daily_check.py、bench_id_normalizer.py 共用。
+
+使用方式：
+    from script_loader import load_script
+
+    fix_yml = load_script('fix-yml-metadata.py')
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+
+
+def load_script(filename: str):
+    """載入檔名含連字號、無法直接 import 的腳本"""
+    name = filename.replace('-', '_').removesuffix('.py')
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+sidecar_yaml.py - 局部更新 .yml 描述檔的頂層欄位（無外部依賴）
+
+只替換或附加指定的頂層欄位，其餘內容（註解、巢狀欄位、
+description 的多行區塊）逐行保留，不經過 YAML 重新序列化。
+
+使用方式：
+    from sidecar_yaml import set_fields
+
+    content = set_fields(content, {'width': 1920, 'height': 600})
+"""
+
+import json
+import re
+
+TOP_LEVEL_KEY_PATTERN = re.compile(r'^([A-Za-z_][\w-]*)\s*:')
+PLAIN_SCALAR_PATTERN = re.compile(r'^[^\s\'"#&*!|>%@`{}\[\],:-][^#:]*$')
+NUMBER_LIKE_PATTERN = re.compile(r'^[-+]?(\d[\d_]*)?(\.\d+)?([eE][-+]?\d+)?$')
+RESERVED_WORDS = {'true', 'false', 'yes', 'no', 'on', 'off', 'null', '~'}
+
+
+def format_scalar(value) -> str:
+    """將 Python 值轉為 YAML 純量"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if value is None:
+        return 'null'
+
+    text = str(value)
+    if (PLAIN_SCALAR_PATTERN.match(text) and text == text.strip()
+            and text.lower() not in RESERVED_WORDS and not NUMBER_LIKE_PATTERN.match(text)):
+        return text
+    # JSON 字串即為合法的 YAML 雙引號字串
+    return json.dumps(text, ensure_ascii=False)
+
+
+def render_field(key: str, value, indent: str = '') -> list:
+    """將欄位轉為 YAML 行（支援純量、dict 與 list）"""
+    if isinstance(value, (dict, list)) and not value:
+        return [f"{indent}{key}: {'{}' if isinstance(value, dict) else '[]'}"]
+
+    if isinstance(value, dict):
+        lines = [f"{indent}{key}:"]
+        for sub_key, sub_value in value.items():
+            lines.extend(render_field(sub_key, sub_value, indent + '  '))
+        return lines
+
+    if isinstance(value, list):
+        lines = [f"{indent}{key}:"]
+        for item in value:
+            if isinstance(item, dict):
+                item_lines = []
+                for sub_key, sub_value in item.items():
+                    item_lines.extend(render_field(sub_key, sub_value, indent + '    '))
+                # 第一個欄位接在 "- " 之後
+                item_lines[0] = f"{indent}  - {item_lines[0].lstrip()}"
+                lines.extend(item_lines)
+            else:
+                lines.append(f"{indent}  - {format_scalar(item)}")
+        return lines
+
+    return [f"{indent}{key}: {format_scalar(value)}"]
+
+
+def _find_block(lines: list, key: str):
+    """回傳頂層欄位所佔的行範圍 (start, end)，不存在時回傳 None"""
+    start = None
+    for i, line in enumerate(lines):
+        match = TOP_LEVEL_KEY_PATTERN.match(line)
+        if match and match.group(1) == key:
+            start = i
+            break
+    if start is None:
+        return None
+
+    end = start + 1
+    while end < len(lines):
+        line = lines[end]
+        if line and not line[0].isspace() and not line.startswith('-'):
+            break
+        end += 1
+
+    # 區塊後的空行保留在原位置
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+
+    return start, end
+
+
+def set_fields(content: str, fields: dict) -> str:
+    """
+    設定頂層欄位：已存在的欄位原地替換，不存在的附加在檔尾
+
+    Args:
+        content: 原始 .yml 內容
+        fields: 欄位名稱 → 值（純量、dict 或 list）
+
+    Returns:
+        更新後的內容；其餘行維持不變
+    """
+    lines = content.split('\n')
+    # 保留檔尾換行
+    trailing = []
+    while lines and lines[-1] == '':
+        trailing.append(lines.pop())
+
+    for key, value in fields.items():
+        block = render_field(key, value)
+        span = _find_block(lines, key)
+        if span:
+            lines[span[0]:span[1]] = block
+        else:
+            lines.extend(block)
+
+    return '\n'.join(lines + trailing) if trailing else '\n'.join(lines) + '\n'
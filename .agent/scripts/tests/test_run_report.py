@@ -0,0 +1,42 @@
+"""
+report 子命令的輸入檢查
+
+執行：python3 -m unittest discover -s .agent/scripts/tests
+"""
+
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analyze_website_design import missing_report_keys, run_report
+
+
+class RunReportTest(unittest.TestCase):
+    def test_css_report_is_rejected(self):
+        css_report = {'colors': {}, 'fonts': {'families': {}, 'sizes': {}},
+                      'spacing': {}, 'breakpoints': [], 'css_classes': {}}
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = Path(tmp) / 'r1.json'
+            json_path.write_text(json.dumps(css_report), encoding='utf-8')
+            md_path = Path(tmp) / 'out.md'
+            out = io.StringIO()
+            with redirect_stdout(out), self.assertRaises(SystemExit) as cm:
+                run_report(SimpleNamespace(json=json_path, output=md_path))
+            self.assertEqual(cm.exception.code, 1)
+            self.assertIn('report only accepts analyze JSON', out.getvalue())
+            self.assertIn('url', out.getvalue())
+            self.assertFalse(md_path.exists())
+
+    def test_non_object_report_is_rejected(self):
+        self.assertIn('url', missing_report_keys([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
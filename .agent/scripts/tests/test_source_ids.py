@@ -0,0 +1,46 @@
+"""
+audit-image-refs.py 前端原始碼 id 引用比對的回歸測試
+
+執行：python3 -m unittest discover -s .agent/scripts/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from script_loader import load_script
+
+audit = load_script('audit-image-refs.py')
+
+
+class ExtractSourceIdsTest(unittest.TestCase):
+    def test_reference_forms(self):
+        source = """
+const logo = await getAssetById('logo');
+const heroImageId = content?.images?.hero || 'ai_banner';
+export default {
+  hero: { image_id: 'hero_proxmox' },
+  images: {
+    hero: 'hero_banner',
+    cards: [{ id: 'partner_1', image_id: 'partner_bitdefender_1' }],
+  },
+};
+<ImageSection image_id="bn_home_m" />
+"""
+        self.assertEqual(audit.extract_source_ids(source), {
+            'logo', 'ai_banner', 'hero_proxmox', 'hero_banner', 'partner_bitdefender_1', 'bn_home_m',
+        })
+
+    def test_ordinary_strings_are_not_references(self):
+        source = """
+variant?: 'default' | 'icon' | 'minimal';
+<div class="banner hero">icon</div>
+const page = { id: 'fortinet', title: 'logo' };
+"""
+        self.assertEqual(audit.extract_source_ids(source), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+tokenize_css 的回歸測試
+
+執行：python3 -m unittest discover -s .agent/scripts/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analyze_website_design import tokenize_css
+
+
+class TokenizeCssTest(unittest.TestCase):
+    def test_data_url_is_rejoined(self):
+        tokens = list(tokenize_css('.a{background:url(data:image/png;base64,AAA;BBB)}.b{color:#fff}'))
+        self.assertEqual(tokens, [
+            ('selector', '.a'),
+            ('declaration', 'background', 'url(data:image/png;base64,AAA;BBB)'),
+            ('selector', '.b'),
+            ('declaration', 'color', '#fff'),
+        ])
+
+    def test_escaped_paren_and_quote_in_selector(self):
+        css = ".content-\\[\\'\\(\\'\\]{content:'('}\n.x\\(a{color:#fff}\n.y{margin:4px}"
+        self.assertEqual(list(tokenize_css(css)), [
+            ('selector', ".content-\\[\\'\\(\\'\\]"),
+            ('declaration', 'content', "'('"),
+            ('selector', '.x\\(a'),
+            ('declaration', 'color', '#fff'),
+            ('selector', '.y'),
+            ('declaration', 'margin', '4px'),
+        ])
+
+    def test_unbalanced_rule_does_not_swallow_stylesheet(self):
+        rules = ''.join(f'.c{i}{{color:#{i:06x}}}' for i in range(5000))
+        tokens = list(tokenize_css('.broken{background:url(a.png}' + rules))
+        self.assertEqual(tokens[0], ('selector', '.broken'))
+        self.assertEqual(sum(1 for token in tokens if token[0] == 'declaration'), 5001)
+        self.assertEqual(tokens[-1], ('declaration', 'color', '#001387'))
+
+
+if __name__ == '__main__':
+    unittest.main()